@@ -1,3 +1,4 @@
+import asyncio
 import queue
 import threading
 
@@ -6,12 +7,18 @@ from discord.ext import commands
 from loguru import logger
 
 import config
+from audio_source import Buffered_audio_source, Ffmpeg_opus_stream_source, Ffmpeg_stream_source
 from downloader import Youtube_downloader
+from ffmpeg_supervisor import ffmpeg_supervisor
+from frame_cache import frame_cache
+from guild_registry import Guild_registry
+from duration_index import format_duration
+from player_renderer import Player_renderer
 from playlist_manager import Playlist_manager
 from song import Song
 
 FFMPEG_OPTIONS = {'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5', 'options': '-vn'}
-guild_controller = {}
+guild_controller = Guild_registry()
 
 
 class Audio_controller():
@@ -22,22 +29,60 @@ class Audio_controller():
         self.playlist = None
         self.audio_source = None
         self.is_loop = False
-        self.playlist_manager = Playlist_manager()
-        self.view = AudioPlayerView(bot, self)
-        self.message = None
+        self._playlist_manager = None
+        self._view = None
+        self.renderer = Player_renderer()
+        self.prefetch_task = None
+        self.prefetched = None
+        self.stream_retries = 0
 
     def resetting(self):
         """
         Resets the music player to its default state.
         """
         self.is_loop = False
-        self.playlist_manager.time_to_shutdown = True
+        if self._playlist_manager is not None:
+            self._playlist_manager.time_to_shutdown = True
         self.playlist = None
-        self.audio_source.cleanup()
+        if self.audio_source is not None:
+            self.audio_source.cleanup()
         self.audio_source = None
-        self.message = None
-        self.playlist_manager = Playlist_manager()
-        self.view = AudioPlayerView(self.bot, self)
+        if self.prefetch_task is not None:
+            self.prefetch_task.cancel()
+            self.prefetch_task = None
+        self.discard_prefetched_source()
+        frame_cache.discard(self)
+        self.renderer.reset()
+        self._playlist_manager = None
+        self._view = None
+
+    @property
+    def playlist_manager(self) -> Playlist_manager:
+        """Playlist_manager: The playlist manager of the session, created on first use."""
+        if self._playlist_manager is None:
+            self._playlist_manager = Playlist_manager()
+        return self._playlist_manager
+
+    @property
+    def view(self):
+        """AudioPlayerView: The buttons of the player message, created on first use."""
+        if self._view is None:
+            self._view = AudioPlayerView(self.bot, self)
+        return self._view
+
+    def is_idle(self) -> bool:
+        """
+        Returns True if the controller has no playback session.
+
+        Returns:
+            bool: True if there is neither a song in the playlist nor a player message.
+        """
+        return not self.playlist and self.message is None
+
+    @property
+    def message(self):
+        """discord.Message: The player message, owned by the renderer."""
+        return self.renderer.message
 
     async def exit(self, ctx):
         """
@@ -65,26 +110,24 @@ class Audio_controller():
             ctx (discord.ext.commands.Context): The context of the command.
             url (str): The URL of the song or playlist to be added.
         """
-        media_type = Youtube_downloader.get_youtube_media_type(url)
-        match media_type:
+        parsed_url = Youtube_downloader.parse_youtube_url(url)
+        if parsed_url is None:
+            await ctx.channel.send("Can't add to playlist, please check your url")
+            return False
+        self.update_target_bitrate(ctx)
+        match parsed_url.kind:
             case "playlist":
-                normalized_url = Youtube_downloader.normalize_youtube_playlist_url(url)
                 await ctx.channel.send("Adding playlist, it may take some time")
-                if not await self._add_playlist_to_playlist(ctx, normalized_url):
+                if not await self._add_playlist_to_playlist(ctx, parsed_url.playlist_url):
                     await ctx.channel.send("Can't add playlist, error in add_to_playlist method")
                     return False
-            case "video":
-                normalized_url = Youtube_downloader.normalize_youtube_video_url(url)
-                if not await self._add_song_to_playlist(ctx, normalized_url):
-                    await ctx.channel.send(f"Can't add {media_type} to playlist, please check your url")
-                    return False
             case "mix":
-                if not await self._add_mix_to_playlist(ctx, url):
-                    await ctx.channel.send(f"Can't add {media_type} to playlist, please check your url")
+                if not await self._add_mix_to_playlist(ctx, parsed_url.mix_url):
+                    await ctx.channel.send(f"Can't add {parsed_url.kind} to playlist, please check your url")
                     return False
             case _:
-                if not await self._add_song_to_playlist(ctx, url):
-                    await ctx.channel.send(f"Can't add {media_type} to playlist, please check your url")
+                if not await self._add_song_to_playlist(ctx, parsed_url.video_url):
+                    await ctx.channel.send(f"Can't add {parsed_url.kind} to playlist, please check your url")
                     return False
         return True
 
@@ -101,11 +144,10 @@ class Audio_controller():
         """
         logger.debug("Add mix")
         try:
-            await self.playlist_manager.add_playlist(url, self.playlist, config.MIX_SONGS_LIMIT)
+            return await self.playlist_manager.add_playlist(url, self.playlist, config.MIX_SONGS_LIMIT)
         except Exception as e:
             logger.error(f"Can't add mix to {url}\n {e}")
             return False
-        return True
 
 
     async def _add_playlist_to_playlist(self, ctx, url: str):
@@ -121,20 +163,18 @@ class Audio_controller():
         """
         logger.debug("Add playlist")
         try:
-            await self.playlist_manager.add_playlist(url, self.playlist)
+            return await self.playlist_manager.add_playlist(url, self.playlist)
         except Exception as e:
             logger.error(f"Can't add playlist to {url}\n {e}")
             return False
-        return True
 
     async def _add_song_to_playlist(self, ctx, url: str):
 
         try:
-            await self.playlist_manager.add_song(url, self.playlist)
+            return await self.playlist_manager.add_song(url, self.playlist)
         except Exception as e:
             logger.error(f"Can't add song {url}\n {e}")
             return False
-        return True
 
     async def play_song(self, ctx, song: Song):
         """
@@ -147,42 +187,285 @@ class Audio_controller():
         logger.debug("Trying to play song")
 
         if ctx.voice_client is not None:
+            self.update_target_bitrate(ctx)
+            audio_source = self.take_prefetched_source(song) or self.open_cached_source(song)
+            if audio_source is None:
+                if not await self.playlist_manager.resolve_song(song):
+                    await self.skip_unplayable_song(ctx, song)
+                    return
+                if self.playlist is not None:
+                    self.playlist.update_song_duration(song)
+                audio_source = await self.start_audio_source(song)
+
+            if ctx.voice_client is None:  # disconnected while waiting for FFmpeg
+                audio_source.cleanup()
+                return
+            self.audio_source = audio_source
+            ctx.voice_client.play(self.audio_source, after=lambda e: self.play_next_song(ctx))
+            logger.debug("Audio stream started")
+
+            content = self.get_now_playing(song)
             if not self.message:
-                if config.AUDIOPLAYER_UI:
-                    self.message = await ctx.channel.send(f"Now playing: {song.title}", view=self.view)
-                else:
-                    self.message = await ctx.channel.send(f"Now playing: {song.title}")
+                await self.renderer.send(ctx.channel, content, self.view if config.AUDIOPLAYER_UI else None)
             else:
-                await self.message.edit(content=f"Now playing: {song.title}")
-
-            self.audio_source = discord.FFmpegPCMAudio(
-                song.url,
-                **FFMPEG_OPTIONS
-            )
-            if ctx.voice_client is not None:
-                ctx.voice_client.play(self.audio_source, after=lambda e: self.play_next_song(ctx))
-                logger.debug("Audio stream started")
+                self.renderer.request_edit(content)
+
+            await self.start_prefetch()
         else:
            await self.exit(ctx)
 
+    async def start_prefetch(self):
+        """
+        Starts prefetching the song that will be played next, replacing a running prefetch.
+        """
+        if config.PREFETCH_NEXT_SONG:
+            await self.cancel_prefetch()
+            self.prefetch_task = self.bot.loop.create_task(self.prefetch_next_song())
+
+    async def cancel_prefetch(self):
+        """
+        Cancels the running prefetch and waits until it has stopped, so two prefetches never run at once.
+        """
+        task, self.prefetch_task = self.prefetch_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def update_target_bitrate(self, ctx):
+        """
+        Makes the playlist manager select audio formats for the bitrate of the voice channel.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+        """
+        voice = ctx.voice_client or getattr(getattr(ctx, 'author', None), 'voice', None)
+        bitrate = getattr(getattr(voice, 'channel', None), 'bitrate', None)
+        if bitrate:
+            self.playlist_manager.target_bitrate = bitrate // 1000
+
+    def get_now_playing(self, song: Song) -> str:
+        """
+        Returns the now playing message of a song with its duration and the time left in the playlist.
+
+        Parameters:
+            song (Song): The song that is playing.
+
+        Returns:
+            str: The text of the message.
+        """
+        content = f"Now playing: {song.title}"
+        if song.duration:
+            content += f" ({format_duration(song.duration)})"
+        if self.playlist is not None and self.playlist.size > 1:
+            content += f"\n{format_duration(self.playlist.remaining_time())} left in the playlist"
+        return content
+
+    def create_audio_source(self, song: Song) -> discord.AudioSource:
+        """
+        Creates an audio source for a resolved song.
+
+        Opus streams are passed through to Discord without transcoding, other codecs are decoded to PCM
+        and encoded by discord.py.
+
+        Parameters:
+            song (Song): The song with a resolved stream URL.
+
+        Returns:
+            discord.AudioSource: The audio source of the song.
+        """
+        if config.OPUS_PASSTHROUGH and Ffmpeg_opus_stream_source.can_pass_through(song.acodec):
+            logger.debug(f"Passing {song.acodec} stream of {song.title} through")
+            return Ffmpeg_opus_stream_source(song.url, codec=song.acodec, **FFMPEG_OPTIONS)
+        return Ffmpeg_stream_source(
+            song.url,
+            **FFMPEG_OPTIONS
+        )
+
+    async def start_audio_source(self, song: Song, wait: bool = True):
+        """
+        Creates the audio source of a song once the FFmpeg supervisor has a free slot.
+
+        The source is read ahead into a buffer, so short stalls of the stream don't reach the player. In loop
+        mode its frames are recorded, so the repeats are played from memory.
+
+        Parameters:
+            song (Song): The song with a resolved stream URL.
+            wait (bool): Wait for a free slot, otherwise return None if all slots are taken.
+
+        Returns:
+            discord.AudioSource: The audio source of the song, or None if no slot was free and `wait` is False.
+        """
+        audio_source = await ffmpeg_supervisor.start(lambda: self.create_audio_source(song), wait=wait)
+        if audio_source is None:
+            return None
+        if config.LOOP_FRAME_CACHE and self.is_loop:
+            audio_source = frame_cache.record(self, song, audio_source, on_drop=self.on_recording_dropped)
+        if config.READ_AHEAD_BUFFER:
+            audio_source = Buffered_audio_source(audio_source)
+        return audio_source
+
+    def on_recording_dropped(self):
+        """
+        Prefetches the repeat of a looped song after all, once its recording turned out too large for the
+        frame cache. Called from the thread reading the audio source.
+        """
+        asyncio.run_coroutine_threadsafe(self.start_prefetch(), self.bot.loop)
+
+    def open_cached_source(self, song: Song):
+        """
+        Returns an audio source that plays a song from the frame cache, e.g. when it is looped.
+
+        Parameters:
+            song (Song): The song about to be played.
+
+        Returns:
+            discord.AudioSource: The audio source, or None if the song isn't cached.
+        """
+        if not config.LOOP_FRAME_CACHE:
+            return None
+        return frame_cache.open(self, song)
+
+    async def prefetch_next_song(self):
+        """
+        Resolves the song that will be played next and warms up its audio source while the current song plays.
+
+        A stream URL that is about to expire is refreshed here, before the song is played.
+        """
+        playlist = self.playlist
+        song = self.get_song_to_prefetch()
+        if song is None:
+            return
+        if self.prefetched is not None and self.prefetched[0] is song:
+            return
+        self.discard_prefetched_source()
+        if self.is_loop and config.LOOP_FRAME_CACHE and frame_cache.will_cache(self, song):
+            return  # the repeat is played from memory
+
+        if not await self.playlist_manager.resolve_song(song):
+            logger.warning(f"Can't prefetch {song.title}")
+            return
+        if self.playlist is not playlist or self.get_song_to_prefetch() is not song:
+            return  # the session was reset or another song started meanwhile
+        self.playlist.update_song_duration(song)
+        audio_source = await self.start_audio_source(song, wait=False)
+        if audio_source is None:
+            return
+        if self.playlist is not playlist or self.get_song_to_prefetch() is not song:
+            audio_source.cleanup()
+            return
+        self.discard_prefetched_source()
+        self.prefetched = (song, audio_source)
+        logger.debug(f"Prefetched {song.title}")
+
+    def get_song_to_prefetch(self):
+        """
+        Returns the song that will be played after the current one.
+
+        Returns:
+            Song: The current song in loop mode, otherwise the next song, or None if there is none.
+        """
+        if self.playlist is None or self.playlist.head is None:
+            return None
+        return self.playlist.head if self.is_loop else self.playlist.peek_next_song()
+
+    def take_prefetched_source(self, song: Song):
+        """
+        Returns the prefetched audio source of a song and forgets it.
+
+        Parameters:
+            song (Song): The song about to be played.
+
+        Returns:
+            discord.AudioSource: The warm audio source, or None if the song was not prefetched.
+        """
+        if self.prefetched is not None and self.prefetched[0] is song:
+            audio_source = self.prefetched[1]
+            self.prefetched = None
+            logger.debug(f"Using prefetched audio source of {song.title}")
+            return audio_source
+        self.discard_prefetched_source()
+        return None
+
+    def discard_prefetched_source(self):
+        """
+        Cleans up the prefetched audio source, if any.
+        """
+        if self.prefetched is not None:
+            self.prefetched[1].cleanup()
+            self.prefetched = None
+
     def play_next_song(self, ctx):
         """
         Plays the next song in the playlist.
 
+        Called from the audio player thread, so the coroutines are scheduled thread-safely on the bot loop.
+
         Parameters:
             ctx (discord.ext.commands.Context): The context of the command.
         """
         if self.playlist is None:
             return
+        is_forbidden = self.is_stream_forbidden()
+        if is_forbidden and self.stream_retries < config.STREAM_MAX_RETRIES:
+            self.stream_retries += 1
+            logger.warning(f"Stream url of {self.playlist.head.title} was rejected, resolving it again")
+            asyncio.run_coroutine_threadsafe(self.restart_song(ctx, self.playlist.head), self.bot.loop)
+            return
+        self.stream_retries = 0
         logger.debug("Changing song: check if loop state is active")
-        if self.is_loop:
+        if self.is_loop and not is_forbidden:
             logger.debug("loop state is active, playing same song")
-            self.bot.loop.create_task(self.play_song(ctx, self.playlist.head))
+            asyncio.run_coroutine_threadsafe(self.play_song(ctx, self.playlist.head), self.bot.loop)
         elif self.playlist.next_song() is not None:
             logger.debug("no loop state, changing song")
-            self.bot.loop.create_task(self.play_song(ctx, self.playlist.head))
+            asyncio.run_coroutine_threadsafe(self.play_song(ctx, self.playlist.head), self.bot.loop)
         else:
-            self.bot.loop.create_task(self.exit(ctx))
+            asyncio.run_coroutine_threadsafe(self.exit(ctx), self.bot.loop)
+
+    def is_stream_forbidden(self) -> bool:
+        """
+        Checks whether the current audio source ended because its stream URL was rejected with HTTP 403.
+
+        Returns:
+            bool: True if the stream URL was rejected, False otherwise.
+        """
+        is_forbidden = getattr(self.audio_source, "is_forbidden", None)
+        return is_forbidden is not None and is_forbidden()
+
+    async def restart_song(self, ctx, song: Song):
+        """
+        Resolves a new stream URL for a song and plays it again.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+            song (Song): The song whose stream URL was rejected.
+        """
+        self.discard_prefetched_source()
+        if not await self.playlist_manager.resolve_song(song, refresh=True):
+            await self.skip_unplayable_song(ctx, song)
+            return
+        await self.play_song(ctx, song)
+
+    async def skip_unplayable_song(self, ctx, song: Song):
+        """
+        Skips a song whose stream URL can't be resolved and plays the next one.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+            song (Song): The song that can't be played.
+        """
+        logger.warning(f"Can't resolve stream url of {song.title}, skipping")
+        self.stream_retries = 0
+        await ctx.channel.send(f"Can't play {song.title}, skipping")
+        next_song = self.playlist.next_song()
+        if next_song is None:
+            await self.exit(ctx)
+            return
+        await self.play_song(ctx, next_song)
 
     async def loop(self, ctx):
         self.is_loop = not self.is_loop
@@ -237,6 +520,123 @@ class Audio_controller():
 
         return True
 
+    async def shuffle(self, ctx):
+        """
+        Shuffles the songs after the current one.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+        """
+        if not self.playlist:
+            logger.debug("can't shuffle, the playlist is empty")
+            await ctx.channel.send("The playlist is empty.")
+            return False
+
+        self.playlist.shuffle()
+        await ctx.channel.send("Playlist shuffled.")
+        return True
+
+    async def move(self, ctx, source: int, destination: int):
+        """
+        Moves a song to another position in the playlist.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+            source (int): The position of the song, starting from 1.
+            destination (int): The new position of the song, starting from 1.
+        """
+        if not self.playlist or not 1 <= source <= self.playlist.size or destination < 1:
+            logger.debug(f"can't move song from {source} to {destination}")
+            await ctx.channel.send("There is no song at this position.")
+            return False
+
+        self.playlist.move_song(source - 1, destination - 1)
+        await ctx.channel.send(f"Moved song {source} to position {min(destination, self.playlist.size)}.")
+        return True
+
+    async def remove(self, ctx, positions: str):
+        """
+        Removes a song or a range of songs from the playlist.
+
+        If the current song is removed, the song after the removed ones starts playing. Playback ends like at
+        the end of the playlist if no song follows them.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+            positions (str): The position of a song or an inclusive range like "3..7", starting from 1.
+        """
+        bounds = self.parse_positions(positions)
+        if not self.playlist or bounds is None or bounds[0] > self.playlist.size:
+            logger.debug(f"can't remove {positions}")
+            await ctx.channel.send("There are no songs at these positions.")
+            return False
+
+        start, stop = bounds
+        current = self.playlist.head
+        removed = self.playlist.remove_range(start - 1, stop)
+        await ctx.channel.send(f"Removed {len(removed)} songs.")
+
+        if current in removed and ctx.voice_client:
+            ctx.voice_client.pause()
+            if self.audio_source is not None:
+                self.audio_source.cleanup()
+            if start - 1 >= self.playlist.size:  # no song follows the removed ones
+                await self.exit(ctx)
+                return True
+            await self.play_song(ctx, self.playlist.head)
+        return True
+
+    async def jump(self, ctx, position: int):
+        """
+        Plays the song at the given position of the playlist.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+            position (int): The position of the song, starting from 1.
+        """
+        voice_client = ctx.voice_client
+
+        if not voice_client:
+            logger.debug("can't jump, not in voice channel")
+            await ctx.channel.send("I'm not in a voice channel.")
+            return False
+
+        song = self.playlist.jump(position - 1) if self.playlist else None
+        if not song:
+            logger.debug(f"can't jump, there is no song at {position}")
+            await ctx.channel.send("There is no song at this position.")
+            return False
+
+        voice_client.pause()
+        self.audio_source.cleanup()
+        await self.play_song(ctx, song)
+
+        if config.AUDIOPLAYER_UI:
+            await self.view.update_view(ctx)
+
+        return True
+
+    @staticmethod
+    def parse_positions(positions: str):
+        """
+        Parses a playlist position or an inclusive range of positions.
+
+        Parameters:
+            positions (str): A position like "3" or a range like "3..7".
+
+        Returns:
+            Union[tuple, None]: The first and the last position, None if the text is not a valid range.
+        """
+        start, _, stop = positions.partition("..")
+        try:
+            start = int(start)
+            stop = int(stop) if stop else start
+        except ValueError:
+            return None
+        if start < 1 or stop < start:
+            return None
+        return start, stop
+
     async def pause(self, ctx):
         voice_client = ctx.voice_client
 
@@ -279,7 +679,17 @@ class Audio_controller():
             await ctx.channel.send("I'm not currently in a voice channel.")
 
     async def get_playlist(self, ctx):
-        await ctx.channel.send(self.playlist.print_playlist())
+        """
+        Sends the page of the playlist with the current song, with buttons to turn the pages.
+
+        Parameters:
+            ctx (discord.ext.commands.Context): The context of the command.
+        """
+        if not self.playlist:
+            await ctx.channel.send("The playlist is empty.")
+            return
+        view = PlaylistView(self)
+        await ctx.channel.send(view.render(), view=view)
 
     async def on_message(self, message):
         """
@@ -289,19 +699,10 @@ class Audio_controller():
         if not self.message:
             return
 
-        if message.content == self.message.content:
+        if message.content == self.renderer.content:
             return
 
-        try:
-            output_message = self.message.content
-            await self.message.delete()
-        except discord.NotFound:
-            logger.warning(f"Failed to delete message, message not found")
-
-        if config.AUDIOPLAYER_UI:
-            self.message = await message.channel.send(output_message, view=self.view)
-        else:
-            self.message = await message.channel.send(output_message)
+        self.renderer.request_repost(message.channel)
 
 
 class AudioPlayerView(discord.ui.View):
@@ -326,7 +727,7 @@ class AudioPlayerView(discord.ui.View):
         else:
             loop_button.style = discord.ButtonStyle.gray
 
-        await self.controller.message.edit(view=self)
+        self.controller.renderer.request_edit()
 
     @discord.ui.button(label=config.BUTTON_PREV_SYMBOL, style=discord.ButtonStyle.blurple)
     async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -362,3 +763,50 @@ class AudioPlayerView(discord.ui.View):
         ctx = await self.bot.get_context(interaction.message)
         await self.controller.exit(ctx)
         await interaction.response.defer(ephemeral=True)
+
+
+class PlaylistView(discord.ui.View):
+    """
+    A paginated view of the playlist that starts at the page with the current song.
+
+    Only the songs of the visible page are rendered, and the playlist caches rendered pages until it changes.
+    """
+
+    def __init__(self, controller, page_size: int = config.PLAYLIST_PAGE_SIZE):
+        super().__init__(timeout=config.PLAYLIST_VIEW_TIMEOUT)
+        self.controller = controller
+        self.page_size = page_size
+        self.page = None
+
+    def render(self) -> str:
+        """
+        Renders the current page and enables the buttons that lead to existing pages.
+
+        Returns:
+            str: The text of the message.
+        """
+        playlist = self.controller.playlist
+        if not playlist:
+            self.prev_page_button.disabled = self.next_page_button.disabled = True
+            return "The playlist is empty."
+
+        page_count = (playlist.size - 1) // self.page_size + 1
+        if self.page is None:
+            self.page = playlist.cursor // self.page_size
+        self.page = max(0, min(self.page, page_count - 1))
+        self.prev_page_button.disabled = self.page == 0
+        self.next_page_button.disabled = self.page == page_count - 1
+
+        content = playlist.print_page(self.page * self.page_size, self.page_size)
+        content += f"Page {self.page + 1}/{page_count}"
+        return content[:config.MESSAGE_MAX_LENGTH]
+
+    @discord.ui.button(label=config.BUTTON_PAGE_PREV_SYMBOL, style=discord.ButtonStyle.blurple)
+    async def prev_page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label=config.BUTTON_PAGE_NEXT_SYMBOL, style=discord.ButtonStyle.blurple)
+    async def next_page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await interaction.response.edit_message(content=self.render(), view=self)
@@ -0,0 +1,267 @@
+import tempfile
+import threading
+from collections import deque
+
+import discord
+from loguru import logger
+
+import config
+
+HTTP_FORBIDDEN_PATTERN = "403 Forbidden"
+OPUS_CODECS = ("opus", "libopus")
+FRAMES_PER_SECOND = 1000 // discord.opus.Encoder.FRAME_LENGTH
+PCM_SILENCE = b"\x00" * discord.opus.Encoder.FRAME_SIZE
+OPUS_SILENCE = b"\xf8\xff\xfe"
+
+
+class Ffmpeg_error_log:
+    """
+    Keeps FFmpeg's error output of an FFmpeg audio source, so the reason a stream ended can be checked.
+
+    discord.py only sees the end of FFmpeg's output, an expired or rejected stream URL looks like the end
+    of the song. The error output is written to a temporary file rather than a pipe, so a chatty FFmpeg
+    can never block on a full pipe.
+
+    Attributes:
+        supervisor (Ffmpeg_supervisor): The supervisor tracking the FFmpeg process, None if untracked.
+
+    Methods:
+        read_errors(): Returns the error output of FFmpeg.
+        is_forbidden(): Returns True if the stream URL was rejected with HTTP 403.
+    """
+
+    supervisor = None
+
+    def __init__(self, source: str, **kwargs):
+        """
+        Starts FFmpeg for the given stream URL.
+
+        Args:
+            source (str): The stream URL.
+            **kwargs: Keyword arguments of the FFmpeg audio source.
+        """
+        self.error_log = tempfile.TemporaryFile()
+        super().__init__(source, stderr=self.error_log, **kwargs)
+
+    def read_errors(self) -> str:
+        """
+        Returns the error output of FFmpeg.
+
+        Returns:
+            str: The error output written so far.
+        """
+        if self.error_log.closed:
+            return ""
+        self.error_log.seek(0)
+        return self.error_log.read().decode(errors="ignore")
+
+    def is_forbidden(self) -> bool:
+        """
+        Returns True if the stream URL was rejected with HTTP 403.
+
+        Returns:
+            bool: True if FFmpeg reported HTTP 403, False otherwise.
+        """
+        return HTTP_FORBIDDEN_PATTERN in self.read_errors()
+
+    def cleanup(self):
+        process = self._process
+        super().cleanup()
+        self.error_log.close()
+        if self.supervisor is not None and process:
+            self.supervisor.finish(process)
+
+
+class Ffmpeg_stream_source(Ffmpeg_error_log, discord.FFmpegPCMAudio):
+    """
+    An FFmpegPCMAudio source that keeps FFmpeg's error output.
+
+    FFmpeg decodes the stream to PCM and discord.py encodes every 20 ms frame to Opus again in the
+    player thread, which works for any codec.
+    """
+
+
+class Ffmpeg_opus_stream_source(Ffmpeg_error_log, discord.FFmpegOpusAudio):
+    """
+    An FFmpegOpusAudio source that keeps FFmpeg's error output.
+
+    With an Opus stream FFmpeg only remuxes the packets (codec copy) and discord.py sends them as they
+    are, so nothing is decoded or encoded. Other codecs are encoded to Opus by FFmpeg.
+    """
+
+    def __init__(self, source: str, codec: str = None, **kwargs):
+        """
+        Starts FFmpeg for the given stream URL.
+
+        Args:
+            source (str): The stream URL.
+            codec (str): The audio codec of the stream, "opus" passes the stream through.
+            **kwargs: Keyword arguments of discord.FFmpegOpusAudio.
+        """
+        super().__init__(source, codec=codec, **kwargs)
+
+    @staticmethod
+    def can_pass_through(codec: str) -> bool:
+        """
+        Returns True if a stream with the given codec can be played without transcoding.
+
+        Args:
+            codec (str): The audio codec of the stream.
+
+        Returns:
+            bool: True for Opus streams.
+        """
+        return codec in OPUS_CODECS
+
+
+class Audio_source_wrapper(discord.AudioSource):
+    """
+    An audio source that passes the frames of another audio source through.
+
+    Other attributes, like the error output of an FFmpeg source, are looked up on the wrapped source,
+    so wrappers can be stacked.
+
+    Attributes:
+        source (discord.AudioSource): The wrapped audio source.
+    """
+
+    def __init__(self, source: discord.AudioSource):
+        self.source = source
+
+    def __getattr__(self, name):
+        if name == "source":  # not set yet
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def read(self) -> bytes:
+        return self.source.read()
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self.source.cleanup()
+
+
+class Buffered_audio_source(Audio_source_wrapper):
+    """
+    Reads the frames of an audio source ahead of playback into a bounded buffer.
+
+    The audio player thread reads a frame every 20 ms and a read that blocks on FFmpeg's pipe, e.g.
+    while the stream connection stalls, turns straight into stutter. A background thread keeps up to
+    `buffer_seconds` of frames ready instead, and the player only waits for FFmpeg before the first
+    frame, until `preroll_seconds` are buffered. When the buffer runs dry the player gets silence and
+    the underrun is counted; playback resumes once the pre-roll is buffered again, so a slow stream
+    plays in larger pieces instead of frame by frame.
+
+    Attributes:
+        source (discord.AudioSource): The wrapped audio source.
+        capacity (int): The maximum number of frames buffered.
+        preroll (int): The number of frames buffered before playback starts or resumes.
+        preroll_timeout (float): The maximum time in seconds the first read waits for the pre-roll.
+        frames (deque): The buffered frames.
+        underruns (int): The number of times the buffer ran dry during playback.
+        frames_read (int): The number of frames read from the wrapped source.
+
+    Methods:
+        fill(): Returns the number of frames buffered.
+        fill_seconds(): Returns the playback time buffered.
+    """
+
+    def __init__(self, source: discord.AudioSource, buffer_seconds: float = config.AUDIO_BUFFER_SECONDS,
+                 preroll_seconds: float = config.AUDIO_PREROLL_SECONDS,
+                 preroll_timeout: float = config.AUDIO_PREROLL_TIMEOUT):
+        """
+        Starts reading the wrapped source in the background.
+
+        Args:
+            source (discord.AudioSource): The audio source to be buffered.
+            buffer_seconds (float): The maximum playback time buffered.
+            preroll_seconds (float): The playback time buffered before playback starts or resumes.
+            preroll_timeout (float): The maximum time in seconds the first read waits for the pre-roll.
+        """
+        super().__init__(source)
+        self.capacity = max(1, int(buffer_seconds * FRAMES_PER_SECOND))
+        self.preroll = min(self.capacity, max(1, int(preroll_seconds * FRAMES_PER_SECOND)))
+        self.preroll_timeout = preroll_timeout
+        self.silence = OPUS_SILENCE if source.is_opus() else PCM_SILENCE
+        self.frames = deque()
+        self.condition = threading.Condition()
+        self.underruns = 0
+        self.frames_read = 0
+        self.started = False
+        self.buffering = False
+        self.ended = False
+        self.closed = False
+        self.reader = threading.Thread(target=self._read_ahead, daemon=True, name=f"read-ahead:{id(self):#x}")
+        self.reader.start()
+
+    def fill(self) -> int:
+        """
+        Returns the number of frames buffered.
+
+        Returns:
+            int: The number of frames ready to be played.
+        """
+        return len(self.frames)
+
+    def fill_seconds(self) -> float:
+        """
+        Returns the playback time buffered.
+
+        Returns:
+            float: The playback time in seconds ready to be played.
+        """
+        return len(self.frames) / FRAMES_PER_SECOND
+
+    def _read_ahead(self):
+        """Reads frames from the wrapped source until it ends, waiting while the buffer is full."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.frames) < self.capacity or self.closed)
+                if self.closed:
+                    return
+            try:
+                frame = self.source.read()
+            except Exception as e:  # the source was cleaned up under the reader
+                logger.debug(f"Read-ahead stopped: {type(e).__name__}: {e}")
+                frame = b""
+            with self.condition:
+                if frame:
+                    self.frames.append(frame)
+                    self.frames_read += 1
+                else:
+                    self.ended = True
+                self.condition.notify_all()
+            if not frame:
+                return
+
+    def read(self) -> bytes:
+        with self.condition:
+            if not self.started:
+                self.started = True
+                self.condition.wait_for(
+                    lambda: len(self.frames) >= self.preroll or self.ended or self.closed, timeout=self.preroll_timeout
+                )
+                self.buffering = not self.frames and not self.ended
+            if self.buffering:
+                if len(self.frames) < self.preroll and not self.ended and not self.closed:
+                    return self.silence
+                self.buffering = False
+            if self.frames:
+                frame = self.frames.popleft()
+                self.condition.notify_all()
+                return frame
+            if self.ended or self.closed:
+                return b""
+            self.underruns += 1
+            self.buffering = True
+            logger.debug(f"Read-ahead buffer ran dry, {self.underruns} underruns")
+            return self.silence
+
+    def cleanup(self):
+        with self.condition:
+            self.closed = True
+            self.frames.clear()
+            self.condition.notify_all()
+        super().cleanup()  # the reader thread exits by itself once the read it may be blocked in returns
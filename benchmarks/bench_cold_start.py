@@ -0,0 +1,84 @@
+"""
+Measures cold-start time-to-first-audio with and without the persistent metadata store.
+
+A restart is imitated by clearing the memory cache and reopening the store, then the first song
+of a queue is resolved the way Audio_controller.play_song resolves it.
+
+Usage:
+    python -m benchmarks.bench_cold_start
+"""
+import os
+import tempfile
+import time
+
+import playlist_manager
+from cache import song_cache
+from metadata_store import Metadata_store
+from playlist_manager import Playlist_manager
+
+LATENCY = 0.5
+SONGS = 50
+
+
+class Fake_extractor:
+    """Imitates YoutubeDL.extract_info with a fixed network latency."""
+
+    def extract_info(self, url, download=False, process=True):
+        time.sleep(LATENCY)
+        video_id = Playlist_manager.get_cache_key(url)
+        expire = int(time.time()) + 6 * 60 * 60
+        return {'title': video_id, 'url': f"https://stream/videoplayback?expire={expire}&id={video_id}", 'duration': 180, 'id': video_id}
+
+
+class Fake_downloader:
+
+    def __init__(self):
+        self.downloader = Fake_extractor()
+
+
+def video_url(i: int) -> str:
+    return f"https://www.youtube.com/watch?v={i:011}"
+
+
+def time_to_first_audio(store) -> float:
+    playlist_manager.metadata_store = store
+    song_cache.clear()
+    manager = Playlist_manager()
+    manager.downloader = Fake_downloader()
+    start = time.perf_counter()
+    song = manager.create_song(video_url(0))
+    elapsed = time.perf_counter() - start
+    assert song.url is not None
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metadata.sqlite3")
+
+        store = Metadata_store(path)
+        time_to_first_audio(store)  # the run before the restart fills the store
+        for i in range(1, SONGS):
+            expire = int(time.time()) + 6 * 60 * 60
+            store.put(f"{i:011}", {'title': str(i), 'url': f"https://stream/videoplayback?expire={expire}",
+                                   'duration': 180, 'webpage_url': video_url(i)}, expire)
+        store.close()
+
+        store = Metadata_store(path)
+        lookups = 10000
+        start = time.perf_counter()
+        for i in range(lookups):
+            store.get(f"{i % SONGS:011}")
+        lookup_time = (time.perf_counter() - start) / lookups
+
+        without_store = time_to_first_audio(None)
+        with_store = time_to_first_audio(store)
+        store.close()
+
+    print(f"extraction latency: {LATENCY * 1000:.0f} ms, store lookup: {lookup_time * 1e6:.1f} us")
+    print(f"time to first audio without store: {without_store * 1000:.1f} ms")
+    print(f"time to first audio with store:    {with_store * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
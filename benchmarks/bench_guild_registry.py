@@ -0,0 +1,71 @@
+"""
+Compares creating a controller for every guild on startup with the lazy guild registry on 10k guilds.
+
+The eager variant builds what on_ready used to build for each guild: an Audio_controller with its
+Playlist_manager and AudioPlayerView. The lazy variant creates controllers only for the guilds that
+actually use the bot. Before YoutubeDL instances were pooled every Playlist_manager built its own,
+which made eager creation too slow to run on all guilds, so it's measured on a sample and extrapolated.
+
+Usage:
+    python -m benchmarks.bench_guild_registry
+"""
+import asyncio
+import time
+import tracemalloc
+
+from loguru import logger
+
+from audio_controller import Audio_controller
+from guild_registry import Guild_registry
+
+GUILDS = 10000
+ACTIVE_GUILDS = 100
+EAGER_SAMPLE = 100
+
+
+class Fake_bot:
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+
+def measure(action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+def eager(bot):
+    controllers = {}
+    for guild in range(EAGER_SAMPLE):
+        controller = Audio_controller(bot)
+        controller.playlist_manager, controller.view
+        controllers[guild] = controller
+    return controllers
+
+
+def lazy(bot):
+    registry = Guild_registry(lambda guild: Audio_controller(bot))
+    for guild in range(0, GUILDS, GUILDS // ACTIVE_GUILDS):
+        controller = registry.get(guild)
+        controller.playlist_manager, controller.view
+    return registry
+
+
+async def main():
+    logger.remove()
+    bot = Fake_bot()
+    _, eager_time, eager_memory = measure(lambda: eager(bot))
+    registry, lazy_time, lazy_memory = measure(lambda: lazy(bot))
+    scale = GUILDS / EAGER_SAMPLE
+    print(f"{GUILDS} guilds, {ACTIVE_GUILDS} of them playing")
+    print(f"eager, extrapolated from {EAGER_SAMPLE}: {eager_time * scale:9.1f} s {eager_memory * scale / 2 ** 20:8.1f} MiB")
+    print(f"lazy, {len(registry)} controllers: {lazy_time:15.1f} s {lazy_memory / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
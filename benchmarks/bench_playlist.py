@@ -0,0 +1,70 @@
+"""
+Compares the array-backed Playlist with the previous linked-list append on 10k-entry queues.
+
+Usage:
+    python -m benchmarks.bench_playlist
+"""
+import random
+import time
+
+from loguru import logger
+
+from playlist import Playlist
+from song import Song
+
+ENTRIES = 10000
+
+
+class Linked_song(Song):
+
+    def __init__(self, title):
+        super().__init__(title=title)
+        self.next = None
+        self.prev = None
+
+
+def append_linked(songs) -> float:
+    """The append of the linked-list playlist, which walked from head to the end on every call."""
+    start = time.perf_counter()
+    head = None
+    for song in songs:
+        if head is None:
+            head = song
+            continue
+        last = head
+        while last.next is not None:
+            last = last.next
+        last.next = song
+        song.prev = last
+    return time.perf_counter() - start
+
+
+def measure(action) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main():
+    logger.remove()
+    playlist = Playlist()
+    songs = [Song(title=str(i)) for i in range(ENTRIES)]
+
+    linked = append_linked([Linked_song(str(i)) for i in range(ENTRIES)])
+    append = measure(lambda: [playlist.append_song(song) for song in songs])
+    lookup = measure(lambda: [playlist[random.randrange(ENTRIES)] for _ in range(ENTRIES)])
+    moves = measure(lambda: [playlist.move_song(random.randrange(ENTRIES), random.randrange(ENTRIES)) for _ in range(1000)])
+    removes = measure(lambda: [playlist.remove_song(random.randrange(playlist.size)) for _ in range(1000)])
+    walk = measure(lambda: [playlist.next_song() for _ in range(playlist.size)])
+
+    print(f"{ENTRIES} entries")
+    print(f"append all, linked list: {linked * 1000:9.1f} ms")
+    print(f"append all, array:       {append * 1000:9.1f} ms")
+    print(f"{ENTRIES} index lookups:     {lookup * 1000:9.1f} ms")
+    print(f"1000 moves:              {moves * 1000:9.1f} ms")
+    print(f"1000 removes:            {removes * 1000:9.1f} ms")
+    print(f"walk with next_song:     {walk * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
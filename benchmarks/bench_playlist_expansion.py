@@ -0,0 +1,58 @@
+"""
+Measures time-to-full-queue of playlist expansion with a fake extractor.
+
+Usage:
+    python -m benchmarks.bench_playlist_expansion
+"""
+import asyncio
+import time
+
+from playlist import Playlist
+from playlist_manager import Playlist_manager
+
+ENTRIES = 200
+LATENCY = 0.02
+
+
+class Fake_extractor:
+    """Imitates YoutubeDL.extract_info with a fixed network latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def extract_info(self, url: str, download: bool = False, process: bool = True):
+        time.sleep(self.latency)
+        return {'title': f"Song {url}", 'url': f"https://stream/{url}", 'duration': 180}
+
+
+class Fake_downloader:
+
+    def __init__(self, latency: float):
+        self.downloader = Fake_extractor(latency)
+
+
+async def time_to_full_queue(concurrency: int) -> float:
+    manager = Playlist_manager()
+    manager.downloader = Fake_downloader(LATENCY)
+    manager.expansion_concurrency = concurrency
+    playlist = Playlist()
+    playlist_info = {'entries': ({'url': str(i)} for i in range(ENTRIES))}
+
+    start = time.perf_counter()
+    await manager._add_other_playlist(playlist_info, playlist)
+    elapsed = time.perf_counter() - start
+    assert playlist.size == ENTRIES
+    return elapsed
+
+
+async def main():
+    baseline = await time_to_full_queue(1)
+    print(f"{ENTRIES} entries, {LATENCY * 1000:.0f} ms per extraction")
+    print(f"concurrency  1: {baseline:.2f} s")
+    for concurrency in (4, 8):
+        elapsed = await time_to_full_queue(concurrency)
+        print(f"concurrency {concurrency:2}: {elapsed:.2f} s ({baseline / elapsed:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
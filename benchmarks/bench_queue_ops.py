@@ -0,0 +1,49 @@
+"""
+Measures shuffle, move, remove-range and jump on large queues.
+
+The operations are slice operations on the list of songs. They are O(n) in theory, but the work is a
+memmove of pointers in C, so on 50k entries each one takes tens of microseconds, about what a handful
+of steps of a pure Python skiplist or balanced tree cost. Shuffle touches every upcoming song with any
+queue structure.
+
+Usage:
+    python -m benchmarks.bench_queue_ops
+"""
+import random
+import time
+
+from loguru import logger
+
+from playlist import Playlist
+from song import Song
+
+SIZES = (5000, 50000, 500000)
+OPERATIONS = 1000
+
+
+def per_operation(action, count: int = OPERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        action()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    logger.remove()
+    print(f"{'entries':>8} {'move':>10} {'remove 10':>10} {'jump':>10} {'shuffle':>10}   (per operation)")
+    for size in SIZES:
+        playlist = Playlist()
+        playlist.extend(Song(title=str(i)) for i in range(size))
+        playlist.jump(size // 2)
+
+        move = per_operation(lambda: playlist.move_song(random.randrange(size), random.randrange(size)))
+        remove = per_operation(lambda: playlist.remove_range(start := random.randrange(playlist.size - 10), start + 10),
+                               size // 20)
+        jump = per_operation(lambda: playlist.jump(random.randrange(playlist.size)))
+        playlist.jump(0)
+        shuffle = per_operation(playlist.shuffle, 10)
+        print(f"{size:>8} {move * 1e6:>8.1f}us {remove * 1e6:>8.1f}us {jump * 1e6:>8.1f}us {shuffle * 1e3:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Measures the startup path of the bot without connecting to Discord: importing the bot module and
+loading the cogs, each in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_startup
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+SCRIPT = """
+import asyncio, sys
+from loguru import logger
+logger.remove()
+import bot
+import discord
+from discord.ext import commands
+client = commands.Bot(command_prefix="", intents=discord.Intents.default())
+with bot.startup_timer.measure("load cogs"):
+    asyncio.run(bot.load_cogs(client))
+print(bot.startup_timer.report())
+print("yt_dlp imported:", "yt_dlp" in sys.modules)
+"""
+
+
+def main():
+    reports = [subprocess.run([sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True).stdout
+               for _ in range(RUNS)]
+    totals = [int(report.split()[2]) for report in reports]
+    print(f"median of {RUNS} runs: {statistics.median(totals)} ms, last run:")
+    print(reports[-1])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Measures the throughput of the single-pass URL parser a >play command runs.
+
+Usage:
+    python -m benchmarks.bench_url_parser
+"""
+import os
+import time
+
+from downloader import Youtube_downloader
+
+ROUNDS = 200
+URLS_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "youtube_urls.txt")
+
+
+def urls_per_second(classify, urls) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for url in urls:
+            classify(url)
+    return ROUNDS * len(urls) / (time.perf_counter() - start)
+
+
+def main():
+    with open(URLS_FILE) as file:
+        urls = [line.strip() for line in file if line.strip()]
+
+    parsed = urls_per_second(Youtube_downloader.parse_youtube_url, urls)
+
+    print(f"{len(urls)} urls x {ROUNDS} rounds")
+    print(f"parse_youtube_url: {parsed:,.0f} urls/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,12 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
 import asyncio
+import hashlib
+import json
 import os
+from contextlib import contextmanager
 
 import discord
 from discord.ext import commands
@@ -8,6 +15,60 @@ from loguru import logger
 
 import config
 from audio_controller import Audio_controller, guild_controller
+from downloader import extractor_pool
+from resolver import resolver
+
+
+class Startup_timer:
+    """
+    Collects the duration of the startup stages and reports where the time goes.
+
+    Attributes:
+        started_at (float): The perf_counter time the process started importing the bot.
+        stages (list): The names and durations of the finished stages.
+        running (dict): The start times of the running stages.
+    """
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.stages = []
+        self.running = {}
+
+    def start(self, stage: str):
+        """Starts measuring a stage."""
+        self.running[stage] = time.perf_counter()
+
+    def stop(self, stage: str):
+        """Stops measuring a stage, stages that aren't running are ignored."""
+        started_at = self.running.pop(stage, None)
+        if started_at is not None:
+            self.stages.append((stage, time.perf_counter() - started_at))
+
+    @contextmanager
+    def measure(self, stage: str):
+        """Measures the stage of a with block."""
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop(stage)
+
+    def report(self) -> str:
+        """
+        Returns a table of the stages with their share of the time since the start.
+
+        Returns:
+            str: The startup timing report.
+        """
+        total = time.perf_counter() - self.started_at
+        lines = [f"Startup took {total * 1000:.0f} ms"]
+        for stage, duration in self.stages:
+            lines.append(f"  {stage:<28} {duration * 1000:8.0f} ms {duration / total:6.1%}")
+        return "\n".join(lines)
+
+
+startup_timer = Startup_timer(STARTED_AT)
+startup_timer.stages.append(("imports", time.perf_counter() - STARTED_AT))
 
 
 def setup_logger():
@@ -35,20 +96,66 @@ def logger_only_level(level):
 
 async def load_cogs(bot):
     """
-    Loads all cogs for the bot.
+    Loads all cogs for the bot concurrently.
     """
     logger.debug(f"Loading cogs")
     cogs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cogs")
-    for filename in os.listdir(cogs_dir):
-        if filename.endswith(".py"):
-            try:
-                cog_name = filename[:-3]
-                cog_path = f'cogs.{cog_name}'
-                await bot.load_extension(cog_path)
-                logger.debug(f"Loaded cog '{cog_name}'")
-            except Exception as e:
-                exception = f"{type(e).__name__}: {e}"
-                logger.error(f"Failed to load cog {cog_name}\n{exception}")
+    cog_names = [filename[:-3] for filename in sorted(os.listdir(cogs_dir)) if filename.endswith(".py")]
+    await asyncio.gather(*(load_cog(bot, cog_name) for cog_name in cog_names))
+
+
+async def load_cog(bot, cog_name: str):
+    """
+    Loads a single cog, a failing cog is logged and doesn't stop the others.
+    """
+    try:
+        await bot.load_extension(f'cogs.{cog_name}')
+        logger.debug(f"Loaded cog '{cog_name}'")
+    except Exception as e:
+        exception = f"{type(e).__name__}: {e}"
+        logger.error(f"Failed to load cog {cog_name}\n{exception}")
+
+
+def get_command_tree_hash(tree) -> str:
+    """
+    Returns a hash of the slash command definitions of the application.
+
+    Args:
+        tree (discord.app_commands.CommandTree): The command tree.
+
+    Returns:
+        str: The SHA-256 hash of the command definitions and the application id.
+    """
+    definitions = sorted((command.to_dict() for command in tree.get_commands()), key=lambda command: command['name'])
+    application_id = getattr(getattr(tree, 'client', None), 'application_id', None)
+    payload = json.dumps({'application_id': application_id, 'commands': definitions}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def sync_command_tree(tree, hash_path: str) -> bool:
+    """
+    Syncs the slash commands with Discord unless they haven't changed since the last sync.
+
+    Args:
+        tree (discord.app_commands.CommandTree): The command tree.
+        hash_path (str): The file the hash of the last synced command definitions is kept in.
+
+    Returns:
+        bool: True if the commands were synced, False if the sync was skipped.
+    """
+    tree_hash = get_command_tree_hash(tree)
+    try:
+        with open(hash_path) as file:
+            if file.read().strip() == tree_hash:
+                logger.debug("Slash-commands didn't change, skipping sync")
+                return False
+    except FileNotFoundError:
+        pass
+    synced = await tree.sync()
+    logger.debug(f"Synced {len(synced)} slash-commands")
+    with open(hash_path, "w") as file:
+        file.write(tree_hash)
+    return True
 
 
 def main():
@@ -61,30 +168,36 @@ def main():
         return
 
     bot = commands.Bot(command_prefix=config.BOT_PREFIX, intents=discord.Intents.all())
+    guild_controller.factory = lambda guild: Audio_controller(bot)
 
     @bot.event
     async def on_ready():
-        for guild in bot.guilds:
-            guild_controller[guild] = Audio_controller(bot)
-            logger.debug(f"Joined {guild.name}")
-        try:
-            synced = await bot.tree.sync()
-            logger.debug(f"Synced {len(synced)} slash-commands")
-        except Exception as e:
-            print(f"Error syncing commands: {e}")
+        logger.debug(f"Joined {len(bot.guilds)} guilds")
+        first_ready = "connect" in startup_timer.running  # on a reconnect the startup work is done
+        if first_ready:
+            startup_timer.stop("connect")
+            asyncio.ensure_future(resolver.run(extractor_pool.warm))
+            hash_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config.COMMAND_TREE_HASH_FILE)
+            try:
+                with startup_timer.measure("command tree sync"):
+                    await sync_command_tree(bot.tree, hash_path)
+            except Exception as e:
+                logger.error(f"Error syncing commands: {e}")
 
+        # the presence isn't kept over a new session, so it is set on every ready event
         await bot.change_presence(activity=discord.Game(name="music, type {}play".format(config.BOT_PREFIX)))
+        if first_ready:
+            logger.info(startup_timer.report())
         logger.debug("Ready to work")
 
     @bot.event
     async def on_guild_join(guild):
-        guild_controller[guild] = Audio_controller(bot, guild)
-        print(f"Joined new guild: {guild.name} ({guild.id})")
+        logger.info(f"Joined new guild: {guild.name} ({guild.id})")
 
     @bot.event
     async def on_message(message):
-        if message.guild:
-            controller = guild_controller[message.guild]
+        controller = guild_controller.peek(message.guild) if message.guild else None
+        if controller is not None:
             await controller.on_message(message)
         await bot.process_commands(message)
 
@@ -99,16 +212,21 @@ def main():
         if after.channel is None and len(before.channel.members) == 1: 
             voice_client = discord.utils.get(bot.voice_clients, guild=before.channel.guild)
             if voice_client and before.channel.id == voice_client.channel.id:
-                await guild_controller[voice_client.guild].message.delete()       
-                guild_controller[voice_client.guild].resetting()
+                controller = guild_controller.peek(voice_client.guild)
+                if controller is not None:
+                    if controller.message is not None:
+                        await controller.message.delete()
+                    controller.resetting()
                 await voice_client.disconnect()
 
     @bot.tree.command(name="pin")
     async def pin(interaction: discord.Interaction):
         await interaction.response.send_message(f"Pon! Latency is {bot.latency}")
 
-    asyncio.run(load_cogs(bot))
+    with startup_timer.measure("load cogs"):
+        asyncio.run(load_cogs(bot))
 
+    startup_timer.start("connect")
     try:
         bot.run(token)
     except discord.LoginFailure:
@@ -0,0 +1,198 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from loguru import logger
+
+import config
+
+
+def estimate_size(value) -> int:
+    """
+    Estimates the memory used by a cached value.
+
+    Args:
+        value: A value stored in the cache, dictionaries, lists and tuples are measured together with their items.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class Lru_cache:
+    """
+    A thread-safe LRU cache with a time to live and a memory cap.
+
+    The least recently used entries are evicted once the cache holds more than `max_entries`
+    entries or more than `max_bytes` estimated bytes. Expired entries are dropped on access.
+
+    Attributes:
+        max_entries (int): The maximum number of entries.
+        max_bytes (int): The maximum estimated size of all entries in bytes.
+        ttl (float): The default time to live of an entry in seconds.
+        size (int): The estimated size of all entries in bytes.
+        hits (int): The number of successful lookups.
+        misses (int): The number of lookups of missing or expired entries.
+        evictions (int): The number of entries evicted to stay within the limits.
+        expirations (int): The number of entries dropped because their time to live has passed.
+
+    Methods:
+        get(key): Returns the value stored under the key, or None.
+        peek(key): Returns the value stored under the key without marking it as used.
+        put(key, value, ttl=None): Stores a value under the key.
+        resize(max_bytes): Changes the memory cap.
+        pop(key): Removes the key from the cache.
+        clear(): Removes all entries.
+        stats(): Returns the counters of the cache.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, sizeof=estimate_size, clock=time.monotonic):
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries (int): The maximum number of entries.
+            max_bytes (int): The maximum estimated size of all entries in bytes.
+            ttl (float): The default time to live of an entry in seconds.
+            sizeof (Callable): Estimates the size of a value in bytes.
+            clock (Callable): Returns the current time in seconds.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the value stored under the key and marks it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Any: The stored value, or None if the key is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """
+        Returns the value stored under the key without marking it as used or counting the lookup.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Any: The stored value, or None if the key is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                return None
+            return entry[2]
+
+    def put(self, key, value, ttl: float = None):
+        """
+        Stores a value under the key, evicting the least recently used entries if needed.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to be stored.
+            ttl (float): The time to live of the entry in seconds, the default time to live if None.
+        """
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            logger.debug(f"Value of {key} is too large to be cached")
+            return
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (expires_at, size, value)
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def resize(self, max_bytes: int):
+        """
+        Changes the memory cap, evicting the least recently used entries that don't fit anymore.
+
+        Args:
+            max_bytes (int): The maximum estimated size of all entries in bytes.
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def pop(self, key):
+        """
+        Removes the key from the cache.
+
+        Args:
+            key (Hashable): The key of the entry.
+        """
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self):
+        """Removes all entries from the cache."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The number of entries, their estimated size and the hit, miss, eviction and expiration counters.
+        """
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def _remove(self, key):
+        expires_at, size, value = self.entries.pop(key)
+        self.size -= size
+
+
+song_cache = Lru_cache(config.SONG_CACHE_MAX_ENTRIES, config.SONG_CACHE_MAX_BYTES, config.SONG_CACHE_TTL)
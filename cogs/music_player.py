@@ -49,7 +49,7 @@ class Music_player(commands.Cog):
                 logger.debug(f"can't execute command, bot is already playing in different channel")
                 return await ctx.channel.send("Bot is already playing music in another channel.")
 
-        if not await Youtube_downloader.is_valid_url(url):
+        if Youtube_downloader.parse_youtube_url(url) is None:
             return await ctx.channel.send("Invalid URL")
 
         if ctx.guild.voice_client:  # if already connected to a voice channel, add song to playlist
@@ -125,6 +125,47 @@ class Music_player(commands.Cog):
         controller = self.get_guild_controller(ctx)
         await controller.get_playlist(ctx)
 
+    @commands.command(name="shuffle", aliases=['sh', 'mix'],
+                      brief=config.SHUFFLE_COMMAND_BRIEF,
+                      description=config.SHUFFLE_COMMAND_DESCRIPTION)
+    @commands.cooldown(3, 1, commands.BucketType.user)
+    @commands.guild_only()
+    async def shuffle(self, ctx):
+        logger.info(f"{config.BOT_PREFIX}shuffle command is executing by {ctx.author}")
+        controller = self.get_guild_controller(ctx)
+        await controller.shuffle(ctx)
+
+    @commands.command(name="move", aliases=['mv'],
+                      brief=config.MOVE_COMMAND_BRIEF,
+                      description=config.MOVE_COMMAND_DESCRIPTION)
+    @commands.cooldown(3, 1, commands.BucketType.user)
+    @commands.guild_only()
+    async def move(self, ctx, source: int = commands.parameter(description="The position of the song."),
+                   destination: int = commands.parameter(description="The new position of the song.")):
+        logger.info(f"{config.BOT_PREFIX}move command is executing by {ctx.author}\nfrom {source} to {destination}")
+        controller = self.get_guild_controller(ctx)
+        await controller.move(ctx, source, destination)
+
+    @commands.command(name="remove", aliases=['rm', 'delete'],
+                      brief=config.REMOVE_COMMAND_BRIEF,
+                      description=config.REMOVE_COMMAND_DESCRIPTION)
+    @commands.cooldown(3, 1, commands.BucketType.user)
+    @commands.guild_only()
+    async def remove(self, ctx, positions: str = commands.parameter(description="The position of a song or a range like 3..7.")):
+        logger.info(f"{config.BOT_PREFIX}remove command is executing by {ctx.author}\npositions = {positions}")
+        controller = self.get_guild_controller(ctx)
+        await controller.remove(ctx, positions)
+
+    @commands.command(name="jump", aliases=['j', 'goto'],
+                      brief=config.JUMP_COMMAND_BRIEF,
+                      description=config.JUMP_COMMAND_DESCRIPTION)
+    @commands.cooldown(3, 1, commands.BucketType.user)
+    @commands.guild_only()
+    async def jump(self, ctx, position: int = commands.parameter(description="The position of the song.")):
+        logger.info(f"{config.BOT_PREFIX}jump command is executing by {ctx.author}\nposition = {position}")
+        controller = self.get_guild_controller(ctx)
+        await controller.jump(ctx, position)
+
     @commands.command(name="stop", aliases=['exit', 'quit', 'die', 'kill'],
                       brief=config.STOP_COMMAND_BRIEF,
                       description=config.STOP_COMMAND_DESCRIPTION)
@@ -157,7 +198,7 @@ class Music_player(commands.Cog):
                     logger.debug(f"can't execute command, bot is already playing in different channel")
                     return await ctx.channel.send("Bot is already playing music in another channel.")
 
-            if not await Youtube_downloader.is_valid_url(url):
+            if Youtube_downloader.parse_youtube_url(url) is None:
                 return await ctx.channel.send("Invalid URL")
 
             if ctx.guild.voice_client:  # if already connected to a voice channel, add song to playlist
@@ -234,9 +275,53 @@ class Music_player(commands.Cog):
             logger.info(f"/playlist command is executing by {interaction.user}")
             ctx = await self.bot.get_context(interaction)
             controller = self.get_guild_controller(ctx)
-            await controller.playlist(ctx)
+            await controller.get_playlist(ctx)
             await interaction.response.send_message("Done", ephemeral=True)
 
+        @app_commands.command(name="shuffle", description=config.SHUFFLE_COMMAND_BRIEF)
+        @app_commands.guild_only()
+        async def slash_shuffle(self, interaction: discord.Interaction):
+            logger.info(f"/shuffle command is executing by {interaction.user}")
+            ctx = await self.bot.get_context(interaction)
+            controller = self.get_guild_controller(ctx)
+            if await controller.shuffle(ctx):
+                await interaction.response.send_message("Shuffled", ephemeral=True)
+            else:
+                await interaction.response.send_message("Can't shuffle", ephemeral=True)
+
+        @app_commands.command(name="move", description=config.MOVE_COMMAND_BRIEF)
+        @app_commands.guild_only()
+        async def slash_move(self, interaction: discord.Interaction, source: int, destination: int):
+            logger.info(f"/move command is executing by {interaction.user}")
+            ctx = await self.bot.get_context(interaction)
+            controller = self.get_guild_controller(ctx)
+            if await controller.move(ctx, source, destination):
+                await interaction.response.send_message("Moved", ephemeral=True)
+            else:
+                await interaction.response.send_message("Can't move", ephemeral=True)
+
+        @app_commands.command(name="remove", description=config.REMOVE_COMMAND_BRIEF)
+        @app_commands.guild_only()
+        async def slash_remove(self, interaction: discord.Interaction, positions: str):
+            logger.info(f"/remove command is executing by {interaction.user}")
+            ctx = await self.bot.get_context(interaction)
+            controller = self.get_guild_controller(ctx)
+            if await controller.remove(ctx, positions):
+                await interaction.response.send_message("Removed", ephemeral=True)
+            else:
+                await interaction.response.send_message("Can't remove", ephemeral=True)
+
+        @app_commands.command(name="jump", description=config.JUMP_COMMAND_BRIEF)
+        @app_commands.guild_only()
+        async def slash_jump(self, interaction: discord.Interaction, position: int):
+            logger.info(f"/jump command is executing by {interaction.user}")
+            ctx = await self.bot.get_context(interaction)
+            controller = self.get_guild_controller(ctx)
+            if await controller.jump(ctx, position):
+                await interaction.response.send_message("Jumped", ephemeral=True)
+            else:
+                await interaction.response.send_message("Can't jump", ephemeral=True)
+
         @app_commands.command(name="stop", description=config.STOP_COMMAND_BRIEF)
         @app_commands.guild_only()
         async def slash_stop(self, interaction: discord.Interaction):
@@ -8,10 +8,46 @@ BUTTON_PAUSE_SYMBOL = "❚❚"
 BUTTON_SKIP_SYMBOL = "▷|"
 BUTTON_LOOP_SYMBOL = "↺"
 BUTTON_KILL_SYMBOL = "💀"
+BUTTON_PAGE_PREV_SYMBOL = "◁"
+BUTTON_PAGE_NEXT_SYMBOL = "▷"
+
+PLAYLIST_PAGE_SIZE = 15
+PLAYLIST_VIEW_TIMEOUT = 5 * 60
+MESSAGE_MAX_LENGTH = 2000
+PLAYER_EDIT_DELAY = 0.5
+PLAYER_REPOST_INTERVAL = 5
+
+GUILD_IDLE_TIMEOUT = 30 * 60
+GUILD_SWEEP_INTERVAL = 60
 
 SLASH_COMMANDS = False
+COMMAND_TREE_HASH_FILE = ".command_tree_hash"
 MIX_SONGS_LIMIT = 25
 
+RESOLVER_MAX_WORKERS = 8
+RESOLVER_MAX_CONCURRENCY = 16
+EXTRACTOR_POOL_SIZE = RESOLVER_MAX_WORKERS
+PLAYLIST_EXPANSION_CONCURRENCY = 8
+PREFETCH_NEXT_SONG = True
+OPUS_PASSTHROUGH = True
+MATCH_CHANNEL_BITRATE = True
+READ_AHEAD_BUFFER = True
+AUDIO_BUFFER_SECONDS = 3
+AUDIO_PREROLL_SECONDS = 0.5
+AUDIO_PREROLL_TIMEOUT = 10
+LOOP_FRAME_CACHE = True
+FRAME_CACHE_TRACK_MAX_BYTES = 16 * 1024 * 1024  # per guild, a few minutes of Opus or about 80 seconds of PCM
+FRAME_CACHE_MAX_BYTES = 256 * 1024 * 1024
+FRAME_CACHE_TTL = 60 * 60
+FFMPEG_MAX_PROCESSES = 64  # FFmpeg processes alive at the same time over all guilds, a playing guild uses up to two
+
+SONG_CACHE_MAX_ENTRIES = 10000
+SONG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SONG_CACHE_TTL = 60 * 60
+STREAM_URL_EXPIRY_MARGIN = 10 * 60
+STREAM_MAX_RETRIES = 2
+METADATA_STORE_PATH = None  # path of the SQLite file that keeps song metadata between restarts, None to disable
+
 PLAY_COMMAND_BRIEF = "Play music in a voice channel"
 LOOP_COMMAND_BRIEF = "Loop the currently playing song"
 SKIP_COMMAND_BRIEF = "Play the next song in the playlist"
@@ -20,6 +56,10 @@ PAUSE_COMMAND_BRIEF = "Pause audio in voice channel"
 RESUME_COMMAND_BRIEF = "Resume audio in voice channel"
 PLAYLIST_COMMAND_BRIEF = "Get a list of songs from the playlist"
 STOP_COMMAND_BRIEF = "Stop audio and disconnect from voice channel"
+SHUFFLE_COMMAND_BRIEF = "Shuffle the upcoming songs in the playlist"
+MOVE_COMMAND_BRIEF = "Move a song to another position in the playlist"
+REMOVE_COMMAND_BRIEF = "Remove a song or a range of songs from the playlist"
+JUMP_COMMAND_BRIEF = "Play the song at the given position in the playlist"
 
 PLAY_COMMAND_DESCRIPTION = f"This command plays music in a voice channel. To use it, type the command followed by a valid YouTube video or playlist link. The bot will check if you are in a voice channel and if the bot is already playing music in the different channel. If not, it will connect to the voice channel and start playing the song. If the bot is already playing music, the command will add the song to the playlist.\n\nRequirements: This command can only be used in a server (not in DMs).\nExamples:\n{BOT_PREFIX}play https://www.youtube.com/watch?v=dQw4w9WgXcQ: Plays the song with the given YouTube link.\n{BOT_PREFIX}play: Sends an error message indicating that a YouTube link is required.\n{BOT_PREFIX}play https://www.youtube.com/watch?v=dQw4w9WgXcQ (while bot is already playing music in the different channel): Sends an error message indicating that the bot is already playing music in another channel.\n{BOT_PREFIX}play https://www.youtube.com/playlist?list=PL8R4u0UAeAo3FisFJfsUuYFTIBcyDk1ti  Plays the playlist with the given YouTube link"
 LOOP_COMMAND_DESCRIPTION = "This command allows users to loop the currently playing song. If the loop mode is on, the bot will repeat the same song until loop mode is turned off. If loop mode is off, the bot will play the next song in the playlist. The command has aliases 'l' and 'repeat'. This command can only be used in a guild, not in direct messages with the bot. This command has a cooldown of 3 uses per 1 second per user. If a user tries to use the command while on cooldown, a message will be sent informing them of the remaining cooldown time."
@@ -27,5 +67,9 @@ SKIP_COMMAND_DESCRIPTION = "This command allows the user to skip the current son
 PREV_COMMAND_DESCRIPTION = "This command plays the previous song in the playlist of the music player. It cannot be used while in loop mode. If the music player is not connected to a voice channel, the command will not execute. If there are no previous songs in the playlist, the command will not execute."
 PAUSE_COMMAND_DESCRIPTION = "The pause command allows a user to pause the audio playback of a music bot in a voice channel. If the bot is not currently playing any audio, it will send a message saying so. Otherwise, the audio will be paused and a message will be sent confirming that the audio source has been paused."
 RESUME_COMMAND_DESCRIPTION = "This command resumes the audio playback in the voice channel, if it was previously paused. If the bot is not currently paused, it will return a message saying so. This command has a cooldown of 3 uses per 1 second per user, and can only be used in a server (not in direct messages)."
-PLAYLIST_COMMAND_DESCRIPTION = "This command displays the current list of songs in the playlist. The bot will send a message in the text channel where the command was used, containing the name of each song, as well as its position in the playlist. If the playlist is empty, the bot will respond with a message saying that there are no songs in the playlist. Note that this command does not affect the playback of songs in the playlist."
-STOP_COMMAND_DESCRIPTION = "This command will stop the currently playing audio and disconnect the bot from the voice channel. If the bot is not currently in a voice channel, it will send a message saying so. Aliases for this command are exit, quit, die, and kill."
\ No newline at end of file
+PLAYLIST_COMMAND_DESCRIPTION = "This command displays the current list of songs in the playlist. The bot will send a message in the text channel where the command was used, showing the page of the playlist with the current song: the name and position of each song and when the upcoming songs start. Use the arrow buttons to turn the pages. If the playlist is empty, the bot will respond with a message saying that there are no songs in the playlist. Note that this command does not affect the playback of songs in the playlist."
+STOP_COMMAND_DESCRIPTION = "This command will stop the currently playing audio and disconnect the bot from the voice channel. If the bot is not currently in a voice channel, it will send a message saying so. Aliases for this command are exit, quit, die, and kill."
+SHUFFLE_COMMAND_DESCRIPTION = f"This command shuffles the songs that come after the currently playing song. The current song keeps playing and the songs that were already played stay in place. This command can only be used in a server (not in DMs).\nExample:\n{BOT_PREFIX}shuffle: Shuffles the upcoming songs."
+MOVE_COMMAND_DESCRIPTION = f"This command moves a song to another position in the playlist. Positions start from 1 and are the numbers shown by the playlist command. A position past the end of the playlist moves the song to the end. The currently playing song keeps playing.\nExample:\n{BOT_PREFIX}move 7 2: Moves the seventh song to the second position."
+REMOVE_COMMAND_DESCRIPTION = f"This command removes a song or an inclusive range of songs from the playlist. Positions start from 1 and are the numbers shown by the playlist command. If the currently playing song is removed, the song after the removed ones starts playing, and the bot leaves the voice channel if no song follows them.\nExamples:\n{BOT_PREFIX}remove 4: Removes the fourth song.\n{BOT_PREFIX}remove 4..10: Removes the songs from the fourth to the tenth."
+JUMP_COMMAND_DESCRIPTION = f"This command stops the current song and plays the song at the given position of the playlist. Positions start from 1 and are the numbers shown by the playlist command. The bot must be in a voice channel.\nExample:\n{BOT_PREFIX}jump 12: Plays the twelfth song of the playlist."
@@ -3,11 +3,11 @@ import itertools
 import re
 import threading
 from queue import Queue
+from typing import NamedTuple, Optional
 
-import aiohttp
-import yt_dlp
 from loguru import logger
 
+from extractor_pool import Extractor_pool
 from song import Song
 from playlist import Playlist
 
@@ -21,140 +21,178 @@ YDL_OPTIONS = {
     "extract_flat": "in_playlist",
 }
 
+URL_PATTERN = re.compile(
+    r"\A(?:https?:)//(?:(?:www|m)\.)?(?P<music>music\.)?(?:youtube(?:-nocookie)?\.com|youtu\.be)"
+    r"(?:/(?P<prefix>v/|e/|embed/|shorts/|live/)?(?P<path_id>[\w-]{11})(?![\w-])|/(?P<playlist>playlist)\b)?"
+    r"(?P<rest>\S*)\Z"
+)
+QUERY_PATTERN = re.compile(r"[?&#](?:v=([\w-]{11})(?![\w-])|list=([\w-]+)|(?:t|start|time_continue)=(\d[\dhms]*))")
+ENCODED_VIDEO_ID_PATTERN = re.compile(r"v%3D([\w-]{11})(?![\w-])")
+TIME_PATTERN = re.compile(r"\A(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?\Z")
+
+
+class ParsedURL(NamedTuple):
+    """
+    A classified YouTube URL.
+
+    Attributes:
+        kind (str): "video", "short", "music", "playlist" or "mix".
+        video_id (str): The video id, None for playlist URLs.
+        list_id (str): The playlist id, None if the URL has no playlist.
+        start (int): The start time in seconds, None if the URL has no start time.
+    """
+    kind: str
+    video_id: Optional[str] = None
+    list_id: Optional[str] = None
+    start: Optional[int] = None
+
+    @property
+    def video_url(self) -> str:
+        """str: The canonical URL of the video."""
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    @property
+    def playlist_url(self) -> str:
+        """str: The canonical URL of the playlist."""
+        return f"https://www.youtube.com/playlist?list={self.list_id}"
+
+    @property
+    def mix_url(self) -> str:
+        """str: The canonical URL of the mix."""
+        return f"https://www.youtube.com/watch?v={self.video_id}&list={self.list_id}"
+
+
+extractor_pool = Extractor_pool(YDL_OPTIONS)
+
 
 class Youtube_downloader:
     """
     A class for downloading and extracting information about songs or playlists from YouTube URLs.
     Attributes:
-    downloader (YoutubeDL): A YoutubeDL object for downloading and extracting information.
+    downloader (Extractor_pool): The shared pool of YoutubeDL instances used for extracting information.
 
     Methods:
-        is_youtube_url(url): Determines whether the given URL is a YouTube URL.
-        is_valid_youtube_url(url): Determines whether the given YouTube URL is valid and the video is not unavailable.
-        is_valid_url(url): Determines whether the given URL is a valid YouTube URL and the video is not unavailable.
+        parse_youtube_url(url): Classifies a YouTube URL and extracts its ids.
         create_song(url, result_queue, is_playlist=False): Downloads and extracts information about a song or playlist from the given URL, creates Song objects, and adds them to the result queue.
     """
 
     def __init__(self):
         """
-        Initializes the Youtube_downloader class and creates a YoutubeDL object for downloading and extracting information.
+        Initializes the Youtube_downloader class with the shared pool of YoutubeDL instances.
         """
-        self.downloader = yt_dlp.YoutubeDL(YDL_OPTIONS)
+        self.downloader = extractor_pool
 
     @staticmethod
-    def is_youtube_url(url: str) -> bool:
+    def parse_youtube_url(url: str):
         """
-        Determines whether the given URL is a valid YouTube URL.
+        Classifies a YouTube URL and extracts its ids in a single pass.
 
         Args:
-            url (str): The URL to be checked.
+            url (str): The URL to be parsed.
 
         Returns:
-            bool: True if the URL is a valid YouTube URL, False otherwise.
+            Union[ParsedURL, None]: The parsed URL, or None if it is not a YouTube video or playlist URL.
         """
-        if re.search(r"^((?:https?:)\/\/)((?:www|m)\.)?(music.)?((?:youtube(-nocookie)?\.com|youtu\.be))(\/(?:[\w\-]+\?v=|embed\/|live\/|v\/)?)([\w\-]+)(\S+)?$", url):
-            return True
-        return False
+        match = URL_PATTERN.match(url.strip())
+        if match is None:
+            return None
+        music, prefix, video_id, playlist, rest = match.groups()
+        list_id = start = None
+        if rest:
+            for query_video_id, query_list_id, query_start in QUERY_PATTERN.findall(rest):
+                if query_video_id:
+                    video_id = video_id or query_video_id
+                elif query_list_id:
+                    list_id = list_id or query_list_id
+                elif start is None:
+                    start = Youtube_downloader._parse_start_time(query_start)
+            if video_id is None and list_id is None:
+                encoded_video_id = ENCODED_VIDEO_ID_PATTERN.search(rest)
+                if encoded_video_id is not None:
+                    video_id = encoded_video_id.group(1)
+
+        if list_id and (playlist or video_id is None):
+            return ParsedURL("playlist", None, list_id, start)
+        if video_id is None:
+            return None
+        if list_id and list_id.startswith("RD"):
+            return ParsedURL("mix", video_id, list_id, start)
+        if prefix == "shorts/":
+            return ParsedURL("short", video_id, list_id, start)
+        if music:
+            return ParsedURL("music", video_id, list_id, start)
+        return ParsedURL("video", video_id, list_id, start)
 
     @staticmethod
-    async def is_valid_youtube_url(url: str) -> bool:
-        """
-        Determines whether the given YouTube URL is valid and the video is not unavailable.
-
-        Args:
-            url (str): The YouTube URL to be checked.
+    def _parse_start_time(value: str):
+        time = TIME_PATTERN.match(value)
+        if time is None:
+            return None
+        hours, minutes, seconds = (int(group) if group else 0 for group in time.groups())
+        return hours * 3600 + minutes * 60 + seconds
 
-        Returns:
-            bool: True if the YouTube URL is valid and the video is not unavailable, False otherwise.
-        """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                pattern_unavailable_video = '"playabilityStatus":{"status":"ERROR","reason":'
-                pattern_unavailable_playlist = '{"type":"ERROR","text":{"runs":[{"text":'
-                pattern_available_music = 'content="YouTube Music">'
-                pattern_private_video = '"errorScreen":{"playerErrorMessageRenderer":{"subreason":{"simpleText":'
-                text = await response.text()
-                if pattern_unavailable_video in text or pattern_unavailable_playlist in text or pattern_private_video in text : return False
-                if 'href="https://music.youtube.com/favicon.ico' in text and pattern_available_music not in text: return False
-                return True
-    
     @staticmethod
-    async def is_valid_url(url: str) -> bool:
+    def get_stream_url_expiry(url: str):
         """
-        Determines whether the given URL is a valid YouTube URL and the video is not unavailable.
+        Returns the expiry time of a YouTube stream URL.
 
         Args:
-            url (str): The URL to be checked.
+            url (str): The stream URL returned by yt-dlp.
 
         Returns:
-            bool: True if the URL is a valid YouTube URL and the video is not unavailable, False otherwise.
+            Union[int, None]: The unix time the stream URL expires at, or None if the URL has no expiry time.
         """
-        if Youtube_downloader.is_youtube_url(url) and await Youtube_downloader.is_valid_youtube_url(url):
-            return True
-        return False
+        expire = re.search(r"[?&/]expire[=/](\d+)", url or "")
+        if expire is not None:
+            return int(expire.group(1))
+        return None
 
     @staticmethod
-    def get_youtube_media_type(url: str) -> str:
+    def get_audio_formats(info: dict) -> list:
         """
-        Determine the type of media associated with a YouTube URL.
-
-        This method analyzes the given YouTube URL and returns the type of media it represents,
-        such as music, mix, short, playlist, or video.
+        Returns the audio-only formats of an extracted video in a compact form.
 
         Args:
-            url (str): The YouTube URL to be analyzed.
+            info (dict): The information returned by extract_info.
 
         Returns:
-            str: A string representing the type of media associated with the URL. Possible values are:
-                - "music" if the URL contains "music".
-                - "mix" if the URL contains "radio".
-                - "short" if the URL contains "short".
-                - "playlist" if the URL contains "playlist".
-                - "video" if none of the above conditions match.
+            list: Dictionaries with format_id, acodec, abr (kbps), filesize and url of every audio-only format.
         """
-        if "music" in url: return "music"
-        if "radio" in url: return "mix"
-        if "short" in url: return "short"
-        if "playlist" in url: return "playlist"
-        return "video"
+        formats = []
+        for audio_format in info.get('formats') or ():
+            if audio_format.get('vcodec') not in (None, 'none') or audio_format.get('acodec') in (None, 'none'):
+                continue
+            abr = audio_format.get('abr') or audio_format.get('tbr')
+            if not abr or not audio_format.get('url'):
+                continue
+            formats.append({
+                'format_id': audio_format.get('format_id'),
+                'acodec': audio_format.get('acodec'),
+                'abr': abr,
+                'filesize': audio_format.get('filesize') or audio_format.get('filesize_approx'),
+                'url': audio_format['url'],
+            })
+        return formats
 
     @staticmethod
-    def normalize_youtube_playlist_url(url):
+    def select_audio_format(formats: list, bitrate: int):
         """
-        Normalizes a YouTube playlist URL.
+        Selects the cheapest audio format that meets the target bitrate, preferring Opus.
 
-        This method takes a YouTube URL and returns a normalized version of it if it represents a playlist.
-        If the input URL is not a playlist URL, it returns None.
+        Opus is preferred because it can be passed through to Discord without transcoding. If no format
+        reaches the target bitrate, the format with the highest bitrate is selected.
 
         Args:
-            url (str): The URL to be normalized.
+            formats (list): The formats returned by get_audio_formats.
+            bitrate (int): The target bitrate in kbps, usually the bitrate of the voice channel.
 
         Returns:
-            Union[str, None]: A normalized YouTube playlist URL if the input URL represents a playlist, 
-            otherwise None.
+            Union[dict, None]: The selected format, None if there are no formats.
         """
-        playlist_id = re.search(r"list=([^&]+)", url)
-        if playlist_id is not None:
-            playlist_id = playlist_id.group(1)
-            print("playlist_id")
-            return f"https://www.youtube.com/playlist?list={playlist_id}"
-        else:
-            print("None")
+        if not formats:
             return None
-        
-    @staticmethod
-    def normalize_youtube_video_url(url: str) -> str:
-        """
-        Normalize a YouTube video URL.
-
-        This method takes a YouTube URL and returns a normalized version of it, 
-        ensuring that it is in the format of 'https://www.youtube.com/watch?v=VIDEO_ID'.
-
-        Args:
-            url (str): The YouTube URL to be normalized.
-
-        Returns:
-            str: A normalized YouTube video URL in the format 'https://www.youtube.com/watch?v=VIDEO_ID'.
-        """
-        video_id = re.findall(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*", url)
-        return f"https://www.youtube.com/watch?v={video_id[0]}"
\ No newline at end of file
+        sufficient = [audio_format for audio_format in formats if audio_format['abr'] >= bitrate]
+        if not sufficient:
+            return max(formats, key=lambda audio_format: (audio_format['abr'], audio_format['acodec'] == 'opus'))
+        opus = [audio_format for audio_format in sufficient if audio_format['acodec'] == 'opus']
+        return min(opus or sufficient, key=lambda audio_format: audio_format['abr'])
@@ -0,0 +1,118 @@
+class Duration_index:
+    """
+    A Fenwick tree over song durations that answers prefix sums in O(log n).
+
+    Appending a duration takes O(log n), so the index can follow a playlist while it is being filled.
+    Other changes of the order are handled by rebuilding the index in O(n).
+
+    Attributes:
+        values (list): The durations in playlist order, unknown durations count as 0.
+        tree (list): The Fenwick tree, tree[i] holds the sum of the durations (i - lowbit(i), i].
+
+    Methods:
+        append(duration): Adds a duration to the end.
+        update(index, duration): Changes the duration at the given position.
+        prefix(index): Returns the sum of the durations before the given position.
+        total(): Returns the sum of all durations.
+        rebuild(durations): Replaces all durations.
+    """
+
+    def __init__(self, durations=()):
+        """
+        Initializes a new instance of the Duration_index class.
+
+        Args:
+            durations (Iterable[int]): The initial durations.
+        """
+        self.values = []
+        self.tree = [0]
+        self.rebuild(durations)
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, duration):
+        """
+        Adds a duration to the end.
+
+        Args:
+            duration (int): The duration in seconds, None if unknown.
+        """
+        duration = duration or 0
+        self.values.append(duration)
+        i = len(self.values)
+        low = i - (i & -i)
+        self.tree.append(self.prefix(i - 1) - self.prefix(low) + duration)
+
+    def update(self, index: int, duration):
+        """
+        Changes the duration at the given position.
+
+        Args:
+            index (int): The position of the duration.
+            duration (int): The new duration in seconds, None if unknown.
+        """
+        duration = duration or 0
+        delta = duration - self.values[index]
+        self.values[index] = duration
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index: int) -> int:
+        """
+        Returns the sum of the durations before the given position.
+
+        Args:
+            index (int): The number of durations to be summed.
+
+        Returns:
+            int: The sum of the first index durations.
+        """
+        total = 0
+        i = min(index, len(self.values))
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def total(self) -> int:
+        """
+        Returns the sum of all durations.
+
+        Returns:
+            int: The sum of all durations.
+        """
+        return self.prefix(len(self.values))
+
+    def rebuild(self, durations):
+        """
+        Replaces all durations, building the tree in O(n).
+
+        Args:
+            durations (Iterable[int]): The new durations, None for unknown ones.
+        """
+        self.values = [duration or 0 for duration in durations]
+        self.tree = [0] + self.values
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+
+def format_duration(seconds) -> str:
+    """
+    Formats a number of seconds as mm:ss, or h:mm:ss for an hour and longer.
+
+    Args:
+        seconds (int): The number of seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,135 @@
+import threading
+from contextlib import contextmanager
+from queue import Empty, Queue
+
+from loguru import logger
+
+import config
+
+
+class Extractor_pool:
+    """
+    A process-wide pool of warm YoutubeDL instances.
+
+    Building a YoutubeDL instance is expensive and an instance must not be used by two threads at
+    once, so every extraction checks an instance out and returns it afterwards. The pool keeps up to
+    `size` idle instances; when all of them are checked out a new one is built rather than waiting,
+    so a caller holding an instance can never deadlock the pool. The number of extractions running at
+    once is bounded by the resolver's thread pool, so `size` should match it.
+
+    Attributes:
+        size (int): The maximum number of idle instances kept.
+        options (dict): The options of the YoutubeDL instances.
+        created (int): The number of instances built.
+        reused (int): The number of checkouts served by an idle instance.
+
+    Methods:
+        warm(): Builds instances until `size` of them are idle.
+        acquire(): Checks an instance out.
+        release(extractor): Returns an instance.
+        checkout(): A context manager that checks an instance out for the duration of a block.
+        extract_info(url, **kwargs): Runs YoutubeDL.extract_info on a checked out instance.
+    """
+
+    def __init__(self, options: dict, size: int = config.EXTRACTOR_POOL_SIZE, factory=None):
+        """
+        Initializes an empty pool.
+
+        Args:
+            options (dict): The options of the YoutubeDL instances.
+            size (int): The maximum number of idle instances kept.
+            factory (Callable[[dict], YoutubeDL]): Builds an instance from the options, YoutubeDL if None.
+        """
+        self.options = options
+        self.size = size
+        self.factory = factory
+        self.idle = Queue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _create(self):
+        with self.lock:
+            self.created += 1
+            if self.factory is None:
+                import yt_dlp  # imported on first use, it's the slowest import of the bot
+                self.factory = yt_dlp.YoutubeDL
+        return self.factory(self.options)
+
+    def warm(self):
+        """Builds instances until `size` of them are idle."""
+        while self.idle.qsize() < self.size:
+            self.idle.put(self._create())
+        logger.debug(f"Extractor pool warmed up with {self.size} instances")
+
+    def acquire(self):
+        """
+        Checks an instance out, building a new one if none is idle.
+
+        Returns:
+            YoutubeDL: An instance that is not used by anybody else.
+        """
+        try:
+            extractor = self.idle.get_nowait()
+        except Empty:
+            return self._create()
+        with self.lock:
+            self.reused += 1
+        return extractor
+
+    def release(self, extractor):
+        """
+        Returns a checked out instance, it's dropped if the pool already keeps `size` idle ones.
+
+        Args:
+            extractor (YoutubeDL): The instance to be returned.
+        """
+        if self.idle.qsize() < self.size:
+            self.idle.put(extractor)
+
+    @contextmanager
+    def checkout(self):
+        """
+        Checks an instance out for the duration of a with block.
+
+        Yields:
+            YoutubeDL: An instance that is not used by anybody else.
+        """
+        extractor = self.acquire()
+        try:
+            yield extractor
+        finally:
+            self.release(extractor)
+
+    def extract_info(self, url: str, **kwargs):
+        """
+        Runs YoutubeDL.extract_info on a checked out instance.
+
+        With process=False the entries of a playlist are a generator that keeps using the instance,
+        so the instance is only returned once the entries are exhausted or dropped.
+
+        Args:
+            url (str): The URL to be extracted.
+            **kwargs: Keyword arguments of YoutubeDL.extract_info.
+
+        Returns:
+            dict: The extracted information, None if the extraction failed.
+        """
+        extractor = self.acquire()
+        try:
+            info = extractor.extract_info(url, **kwargs)
+        except BaseException:
+            self.release(extractor)
+            raise
+        entries = info.get('entries') if isinstance(info, dict) else None
+        if entries is not None and not isinstance(entries, (list, tuple)):
+            info['entries'] = self._release_after(entries, extractor)
+            return info
+        self.release(extractor)
+        return info
+
+    def _release_after(self, entries, extractor):
+        try:
+            yield from entries
+        finally:
+            self.release(extractor)
@@ -0,0 +1,262 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from loguru import logger
+
+import config
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+class Ffmpeg_process:
+    """
+    The accounting of an FFmpeg process started through the supervisor.
+
+    Attributes:
+        process (subprocess.Popen): The FFmpeg process.
+        queued_for (float): The time in seconds the start request waited for a free slot.
+        spawn_latency (float): The time in seconds it took to create the audio source and fork FFmpeg.
+        started_at (float): The clock time the process was started.
+    """
+
+    __slots__ = ("process", "queued_for", "spawn_latency", "started_at")
+
+    def __init__(self, process, queued_for: float, spawn_latency: float, started_at: float):
+        self.process = process
+        self.queued_for = queued_for
+        self.spawn_latency = spawn_latency
+        self.started_at = started_at
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def read_usage(self):
+        """
+        Reads the resident memory and the CPU time of the process from /proc.
+
+        Returns:
+            tuple: The resident memory in bytes and the CPU time in seconds, None for both if unavailable.
+        """
+        try:
+            with open(f"/proc/{self.pid}/stat") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/statm") as file:
+                resident_pages = int(file.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None, None
+        cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime and stime, fields 14 and 15 of stat
+        return resident_pages * os.sysconf("SC_PAGE_SIZE"), cpu
+
+
+class Ffmpeg_supervisor:
+    """
+    Limits the number of FFmpeg processes alive at the same time and keeps track of them.
+
+    Every audio source forks an FFmpeg process, and a burst of skips across guilds would fork as many
+    as there are requests. A source is started only when one of `max_processes` slots is free; the
+    other start requests wait in a FIFO queue, so a busy guild can't starve the others. The slot is
+    returned when the source is cleaned up, or when the supervisor finds that its process has exited.
+    Finished processes are polled, which also reaps them so no zombies are left behind.
+
+    Slots are released from the audio player thread, so the queue is guarded by a lock and waiters
+    are woken up on their own event loop.
+
+    Attributes:
+        max_processes (int): The maximum number of FFmpeg processes alive at the same time.
+        clock (Callable[[], float]): The clock used to measure the latencies.
+        processes (dict): The accounting of the running processes by process.
+        waiters (deque): The event loops and futures of the waiting start requests, oldest first.
+        in_use (int): The number of slots taken.
+        started (int): The number of processes started.
+        peak (int): The highest number of slots taken at the same time.
+        max_queued_for (float): The longest time a start request waited for a slot.
+
+    Methods:
+        start(factory, wait): Creates an audio source once a slot is free and tracks its process.
+        finish(process): Forgets a process and returns its slot.
+        reap(): Returns the slots of processes that have exited.
+        stats(): Returns the counters and the usage of every process.
+    """
+
+    def __init__(self, max_processes: int = config.FFMPEG_MAX_PROCESSES, clock=time.perf_counter):
+        """
+        Initializes a new instance of the Ffmpeg_supervisor class.
+
+        Args:
+            max_processes (int): The maximum number of FFmpeg processes alive at the same time.
+            clock (Callable[[], float]): The clock used to measure the latencies.
+        """
+        self.max_processes = max_processes
+        self.clock = clock
+        self.processes = {}
+        self.waiters = deque()
+        self.in_use = 0
+        self.started = 0
+        self.peak = 0
+        self.max_queued_for = 0.0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.processes)
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a slot if one is free and nobody is waiting for it.
+
+        Returns:
+            bool: True if a slot was taken, False otherwise.
+        """
+        self.reap()
+        with self.lock:
+            if self.in_use >= self.max_processes or self.waiters:
+                return False
+            self._take_slot()
+            return True
+
+    async def acquire(self):
+        """
+        Takes a slot, waiting behind the earlier requests until one is free.
+        """
+        if self.try_acquire():
+            return
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self.lock:
+            self.waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self.lock:
+                queued = waiter in self.waiters
+                if queued:
+                    self.waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                self.release()  # the slot was handed over right before the cancellation
+            raise
+
+    def release(self):
+        """
+        Returns a slot, handing it over to the oldest waiting request if there is one. Thread-safe.
+        """
+        with self.lock:
+            if not self.waiters:
+                self.in_use = max(0, self.in_use - 1)
+                return
+            loop, future = self.waiters.popleft()
+        loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _hand_over(self, future):
+        if future.done():  # cancelled in the meantime, pass the slot on
+            self.release()
+        else:
+            future.set_result(None)
+
+    def _take_slot(self):
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+
+    async def start(self, factory, wait: bool = True):
+        """
+        Creates an audio source once a slot is free and tracks its FFmpeg process.
+
+        Args:
+            factory (Callable[[], discord.AudioSource]): Creates the audio source, which starts FFmpeg.
+            wait (bool): Wait for a slot if none is free, otherwise give up.
+
+        Returns:
+            discord.AudioSource: The audio source, or None if `wait` is False and no slot is free.
+        """
+        queued_at = self.clock()
+        if wait:
+            await self.acquire()
+        elif not self.try_acquire():
+            logger.debug(f"All {self.max_processes} FFmpeg slots are taken, not starting FFmpeg")
+            return None
+        spawned_at = self.clock()
+        try:
+            source = factory()
+        except BaseException:
+            self.release()
+            raise
+
+        process = getattr(source, "_process", None)
+        if not process:  # not an FFmpeg source, nothing to track
+            self.release()
+            return source
+        record = Ffmpeg_process(process, spawned_at - queued_at, self.clock() - spawned_at, spawned_at)
+        with self.lock:
+            self.processes[process] = record
+            self.started += 1
+            self.max_queued_for = max(self.max_queued_for, record.queued_for)
+        source.supervisor = self
+        logger.debug(
+            f"Started FFmpeg {record.pid} after {record.queued_for * 1000:.0f} ms in queue and "
+            f"{record.spawn_latency * 1000:.0f} ms to spawn, {len(self.processes)}/{self.max_processes} running"
+        )
+        return source
+
+    def finish(self, process):
+        """
+        Forgets a process and returns its slot, a process that was already forgotten is ignored. Thread-safe.
+
+        Args:
+            process (subprocess.Popen): The FFmpeg process of a cleaned up audio source.
+        """
+        with self.lock:
+            record = self.processes.pop(process, None)
+        if record is not None:
+            self.release()
+
+    def reap(self) -> int:
+        """
+        Polls the tracked processes and returns the slots of those that have exited.
+
+        Polling collects the exit status of a finished process, so it doesn't linger as a zombie until
+        its audio source is cleaned up.
+
+        Returns:
+            int: The number of processes reaped.
+        """
+        with self.lock:
+            exited = [process for process in self.processes if process.poll() is not None]
+        for process in exited:
+            self.finish(process)
+        return len(exited)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the supervisor and the usage of every running process.
+
+        Returns:
+            dict: The counters, and per process the pid, resident memory, CPU time, start latencies and age.
+        """
+        self.reap()
+        now = self.clock()
+        with self.lock:
+            records = list(self.processes.values())
+            stats = {
+                'running': len(records),
+                'waiting': len(self.waiters),
+                'started': self.started,
+                'peak': self.peak,
+                'max_queued_for': self.max_queued_for,
+            }
+        stats['processes'] = []
+        for record in records:
+            rss, cpu = record.read_usage()
+            stats['processes'].append({
+                'pid': record.pid,
+                'rss': rss,
+                'cpu': cpu,
+                'queued_for': record.queued_for,
+                'spawn_latency': record.spawn_latency,
+                'age': now - record.started_at,
+            })
+        return stats
+
+
+ffmpeg_supervisor = Ffmpeg_supervisor()
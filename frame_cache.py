@@ -0,0 +1,311 @@
+import sys
+import threading
+
+import discord
+from loguru import logger
+
+import config
+from audio_source import FRAMES_PER_SECOND, Audio_source_wrapper
+from cache import Lru_cache
+
+COMPLETE_RATIO = 0.9  # share of the song's duration a recording needs to count as the whole track
+
+
+class Cached_track:
+    """
+    The frames of a track kept in memory.
+
+    Attributes:
+        song_id (str): The video id of the song.
+        frames (list): The frames of the track as the audio source returned them.
+        is_opus (bool): True if the frames are Opus packets, False if they are PCM.
+        size (int): The memory used by the frames in bytes.
+    """
+
+    __slots__ = ("song_id", "frames", "is_opus", "size")
+
+    def __init__(self, song_id: str, frames: list, is_opus: bool, size: int):
+        self.song_id = song_id
+        self.frames = frames
+        self.is_opus = is_opus
+        self.size = size
+
+
+class Cached_audio_source(discord.AudioSource):
+    """
+    Plays the frames of a cached track from memory, without FFmpeg or a network request.
+    """
+
+    def __init__(self, track: Cached_track):
+        self.track = track
+        self.position = 0
+
+    def read(self) -> bytes:
+        if self.position >= len(self.track.frames):
+            return b""
+        frame = self.track.frames[self.position]
+        self.position += 1
+        return frame
+
+    def is_opus(self) -> bool:
+        return self.track.is_opus
+
+
+class Frame_recorder(Audio_source_wrapper):
+    """
+    Passes the frames of an audio source through and keeps a copy of them for the frame cache.
+
+    The frames are stored once the source ends by itself with the whole track. A recording that
+    outgrows the track budget or the global budget is dropped right away, and so is one cut short by a
+    cleanup, a rejected stream URL or a stream that ended early. Only a recording dropped for the budget
+    calls `on_drop`, so the player can prepare the repeat some other way.
+    """
+
+    def __init__(self, cache, owner, song, source: discord.AudioSource, on_drop=None):
+        """
+        Starts recording an audio source.
+
+        Args:
+            cache (Frame_cache): The cache the track is stored in.
+            owner (Hashable): The player the track belongs to, usually the audio controller of a guild.
+            song (Song): The song that is played.
+            source (discord.AudioSource): The audio source to be recorded.
+            on_drop (Callable[[], None]): Called from the reading thread if the recording doesn't fit.
+        """
+        super().__init__(source)
+        self.cache = cache
+        self.owner = owner
+        self.song = song
+        self.on_drop = on_drop
+        self.frames = []
+        self.size = 0
+
+    @property
+    def is_recording(self) -> bool:
+        return self.frames is not None
+
+    def read(self) -> bytes:
+        frame = self.source.read()
+        if self.frames is None:
+            return frame
+        if not frame:
+            self._finish()
+            return frame
+        if not self.cache.reserve(self, sys.getsizeof(frame)):
+            logger.debug(f"{self.song.title} doesn't fit in the frame cache, not caching it")
+            if self._drop() and self.on_drop is not None:
+                self.on_drop()
+            return frame
+        self.frames.append(frame)
+        return frame
+
+    def _finish(self):
+        """Stores the recording if it holds the whole track."""
+        frames = self.frames
+        is_forbidden = getattr(self.source, "is_forbidden", None)
+        expected = (self.song.duration or 0) * FRAMES_PER_SECOND * COMPLETE_RATIO
+        if not self._drop():  # the player was reset meanwhile
+            return
+        if not frames or (is_forbidden is not None and is_forbidden()) or len(frames) < expected:
+            logger.debug(f"Recording of {self.song.title} is incomplete, not caching it")
+        else:
+            self.cache.store(self.owner, Cached_track(self.song.id, frames, self.is_opus(), self.size))
+
+    def _drop(self) -> bool:
+        self.frames = None
+        return self.cache.stop_recording(self)
+
+    def cleanup(self):
+        if self.frames is not None:
+            self._drop()
+        super().cleanup()
+
+
+class Frame_cache:
+    """
+    Keeps the frames of the last fully played track of every player, so a looped track is replayed
+    from memory instead of starting FFmpeg and downloading it again.
+
+    Every player keeps one track of at most `max_track_bytes`, longer tracks are streamed on every
+    repeat. The cached tracks and the frames of the running recordings together stay within
+    `max_bytes`: a growing recording evicts the least recently used tracks, and is dropped itself if
+    the recordings alone would exceed the budget. Opus passthrough frames take about 3 MB for a few
+    minutes of audio, PCM frames take ten times more.
+
+    Attributes:
+        max_track_bytes (int): The maximum size of the track of one player in bytes.
+        max_bytes (int): The maximum size of all tracks and recordings in bytes.
+        tracks (Lru_cache): The cached tracks by player.
+        recordings (dict): The running recordings of every player.
+        recording_bytes (int): The size of the frames of the running recordings in bytes.
+        replays (int): The number of tracks played from memory.
+
+    Methods:
+        record(owner, song, source, on_drop): Wraps an audio source so its frames are cached once it ends.
+        reserve(recorder, size): Accounts for a frame of a running recording.
+        open(owner, song): Returns an audio source that plays a cached track.
+        will_cache(owner, song): Returns True if a song is cached or being recorded.
+        discard(owner): Drops the track and the running recordings of a player.
+    """
+
+    def __init__(self, max_track_bytes: int = config.FRAME_CACHE_TRACK_MAX_BYTES,
+                 max_bytes: int = config.FRAME_CACHE_MAX_BYTES, ttl: float = config.FRAME_CACHE_TTL):
+        """
+        Initializes a new instance of the Frame_cache class.
+
+        Args:
+            max_track_bytes (int): The maximum size of the track of one player in bytes.
+            max_bytes (int): The maximum size of all tracks and recordings in bytes.
+            ttl (float): The time in seconds after which a cached track is dropped.
+        """
+        self.max_track_bytes = max_track_bytes
+        self.max_bytes = max_bytes
+        self.tracks = Lru_cache(max_entries=sys.maxsize, max_bytes=max_bytes, ttl=ttl, sizeof=lambda track: track.size)
+        self.recordings = {}
+        self.recording_bytes = 0
+        self.lock = threading.Lock()
+        self.replays = 0
+
+    def record(self, owner, song, source: discord.AudioSource, on_drop=None) -> Frame_recorder:
+        """
+        Wraps an audio source so its frames are cached once it has played the whole track.
+
+        Args:
+            owner (Hashable): The player the track belongs to.
+            song (Song): The song that is played.
+            source (discord.AudioSource): The audio source of the song.
+            on_drop (Callable[[], None]): Called from the reading thread if the recording doesn't fit.
+
+        Returns:
+            Frame_recorder: The recording audio source.
+        """
+        recorder = Frame_recorder(self, owner, song, source, on_drop)
+        with self.lock:
+            self.recordings.setdefault(owner, []).append(recorder)
+        return recorder
+
+    def reserve(self, recorder: Frame_recorder, size: int) -> bool:
+        """
+        Accounts for a frame of a running recording, evicting cached tracks to make room for it.
+
+        Args:
+            recorder (Frame_recorder): The recording.
+            size (int): The size of the frame in bytes.
+
+        Returns:
+            bool: True if the frame fits, False if the recording is over the track or the global budget,
+            or was discarded.
+        """
+        with self.lock:
+            if recorder not in self.recordings.get(recorder.owner, ()):
+                return False
+            if recorder.size + size > self.max_track_bytes or self.recording_bytes + size > self.max_bytes:
+                return False
+            recorder.size += size
+            self.recording_bytes += size
+            self.tracks.resize(self.max_bytes - self.recording_bytes)
+        return True
+
+    def stop_recording(self, recorder: Frame_recorder) -> bool:
+        """
+        Forgets a finished or dropped recording and releases the memory reserved for its frames.
+
+        Args:
+            recorder (Frame_recorder): The recording.
+
+        Returns:
+            bool: True if the recording was running, False if it was discarded before.
+        """
+        with self.lock:
+            recorders = self.recordings.get(recorder.owner, [])
+            running = recorder in recorders
+            if running:
+                recorders.remove(recorder)
+                self._release(recorder)
+            if not recorders:
+                self.recordings.pop(recorder.owner, None)
+            return running
+
+    def _release(self, recorder: Frame_recorder):
+        """Releases the memory reserved for a recording, the lock must be held."""
+        self.recording_bytes -= recorder.size
+        self.tracks.resize(self.max_bytes - self.recording_bytes)
+
+    def store(self, owner, track: Cached_track):
+        """
+        Stores the track of a player, replacing its previous track.
+
+        Args:
+            owner (Hashable): The player the track belongs to.
+            track (Cached_track): The recorded track.
+        """
+        self.tracks.put(owner, track)
+        logger.debug(f"Cached {len(track.frames)} frames ({track.size} bytes) of {track.song_id}, {self.tracks.stats()}")
+
+    def open(self, owner, song):
+        """
+        Returns an audio source that plays the cached track of a player, if it is the given song.
+
+        Args:
+            owner (Hashable): The player.
+            song (Song): The song to be played.
+
+        Returns:
+            Cached_audio_source: The audio source, or None if the song isn't cached.
+        """
+        track = self.tracks.get(owner)
+        if track is None or song.id is None or track.song_id != song.id:
+            return None
+        self.replays += 1
+        logger.debug(f"Playing {song.title} from memory")
+        return Cached_audio_source(track)
+
+    def will_cache(self, owner, song) -> bool:
+        """
+        Returns True if a song is cached for a player or its recording is still running.
+
+        Args:
+            owner (Hashable): The player.
+            song (Song): The song.
+
+        Returns:
+            bool: True if the song can be expected to be played from memory.
+        """
+        if song.id is None:
+            return False
+        with self.lock:
+            recorders = list(self.recordings.get(owner, []))
+        if any(recorder.song.id == song.id and recorder.is_recording for recorder in recorders):
+            return True
+        track = self.tracks.peek(owner)
+        return track is not None and track.song_id == song.id
+
+    def discard(self, owner):
+        """
+        Drops the track and the running recordings of a player.
+
+        Args:
+            owner (Hashable): The player.
+        """
+        with self.lock:
+            recorders = self.recordings.pop(owner, [])
+            for recorder in recorders:
+                recorder.frames = None
+                self._release(recorder)
+        self.tracks.pop(owner)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The counters of the track cache, the number and size of running recordings and the replays.
+        """
+        stats = self.tracks.stats()
+        stats['recordings'] = sum(len(recorders) for recorders in self.recordings.values())
+        stats['recording_bytes'] = self.recording_bytes
+        stats['replays'] = self.replays
+        return stats
+
+
+frame_cache = Frame_cache()
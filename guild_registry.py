@@ -0,0 +1,109 @@
+import time
+
+from loguru import logger
+
+import config
+
+
+class Guild_registry:
+    """
+    Keeps the audio controllers of guilds, creating them on first use and evicting idle ones.
+
+    Most guilds never play anything, so no controller is created up front. A controller that has no
+    playback session and wasn't used for `idle_timeout` seconds is dropped; the sweep runs at most
+    once per `sweep_interval` seconds, during a lookup.
+
+    Attributes:
+        factory (Callable[[discord.Guild], Audio_controller]): Creates the controller of a guild.
+        controllers (dict): The controllers by guild.
+        last_used (dict): The time each controller was last looked up.
+
+    Methods:
+        get(guild): Returns the controller of a guild, creating it if needed.
+        peek(guild): Returns the controller of a guild if it exists.
+        evict_idle(): Drops the controllers that have been idle for too long.
+    """
+
+    def __init__(self, factory=None, idle_timeout: float = config.GUILD_IDLE_TIMEOUT,
+                 sweep_interval: float = config.GUILD_SWEEP_INTERVAL, clock=time.monotonic):
+        """
+        Initializes a new instance of the Guild_registry class.
+
+        Args:
+            factory (Callable[[discord.Guild], Audio_controller]): Creates the controller of a guild.
+            idle_timeout (float): The time in seconds after which an idle controller is evicted.
+            sweep_interval (float): The minimal time in seconds between two sweeps for idle controllers.
+            clock (Callable[[], float]): The clock used to measure idle time.
+        """
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.controllers = {}
+        self.last_used = {}
+        self.last_sweep = clock()
+
+    def __len__(self):
+        return len(self.controllers)
+
+    def __contains__(self, guild):
+        return guild in self.controllers
+
+    def __getitem__(self, guild):
+        return self.get(guild)
+
+    def get(self, guild):
+        """
+        Returns the controller of a guild, creating it if needed.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            Audio_controller: The controller of the guild.
+
+        Raises:
+            RuntimeError: If no factory was set, the bot sets it on startup.
+        """
+        now = self.clock()
+        if now - self.last_sweep >= self.sweep_interval:
+            self.evict_idle()
+        controller = self.controllers.get(guild)
+        if controller is None:
+            if self.factory is None:
+                raise RuntimeError("Guild_registry has no factory to create a controller, set one before looking up a guild")
+            controller = self.factory(guild)
+            self.controllers[guild] = controller
+            logger.debug(f"Created controller for {guild}")
+        self.last_used[guild] = now
+        return controller
+
+    def peek(self, guild):
+        """
+        Returns the controller of a guild without creating it.
+
+        Args:
+            guild (discord.Guild): The guild.
+
+        Returns:
+            Union[Audio_controller, None]: The controller of the guild, None if it doesn't exist.
+        """
+        return self.controllers.get(guild)
+
+    def evict_idle(self) -> int:
+        """
+        Drops the controllers without a playback session that haven't been used for `idle_timeout` seconds.
+
+        Returns:
+            int: The number of evicted controllers.
+        """
+        now = self.clock()
+        self.last_sweep = now
+        idle = [guild for guild, controller in self.controllers.items()
+                if now - self.last_used[guild] >= self.idle_timeout and controller.is_idle()]
+        for guild in idle:
+            del self.controllers[guild]
+            del self.last_used[guild]
+        if idle:
+            logger.debug(f"Evicted {len(idle)} idle controllers, {len(self.controllers)} left")
+        return len(idle)
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+import config
+
+
+class Metadata_store:
+    """
+    A persistent SQLite store of song metadata that survives restarts.
+
+    Titles, durations and video ids are kept permanently. Stream URLs expire, so they are stored together
+    with their expiry time and only returned while they are still valid.
+
+    Attributes:
+        path (str): The path of the database file.
+        connection (sqlite3.Connection): The connection shared by all threads, guarded by a lock.
+
+    Methods:
+        get(video_id): Returns the stored metadata of a video.
+        put(video_id, song_info, expire): Stores the metadata of a video.
+        close(): Closes the database.
+    """
+
+    def __init__(self, path: str, expiry_margin: int = config.STREAM_URL_EXPIRY_MARGIN):
+        """
+        Opens the database in WAL mode and creates the table if needed.
+
+        Args:
+            path (str): The path of the database file.
+            expiry_margin (int): Stream URLs expiring within this many seconds are not returned.
+        """
+        self.path = path
+        self.expiry_margin = expiry_margin
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS songs ("
+            "id TEXT PRIMARY KEY, title TEXT, duration INTEGER, webpage_url TEXT, url TEXT, expire INTEGER, acodec TEXT)"
+        )
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(songs)")]
+        if 'acodec' not in columns:  # databases created before the codec was stored
+            self.connection.execute("ALTER TABLE songs ADD COLUMN acodec TEXT")
+        logger.debug(f"Metadata store opened at {path}")
+
+    def get(self, video_id: str):
+        """
+        Returns the stored metadata of a video.
+
+        Args:
+            video_id (str): The YouTube video id.
+
+        Returns:
+            Union[dict, None]: The song information, with url and expire set to None if the stored stream URL has expired,
+            or None if the video is unknown.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT title, duration, webpage_url, url, expire, acodec FROM songs WHERE id = ?", (video_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        title, duration, webpage_url, url, expire, acodec = row
+        if expire is None or expire <= time.time() + self.expiry_margin:
+            url = expire = acodec = None
+        return {'title': title, 'url': url, 'duration': duration, 'id': video_id, 'webpage_url': webpage_url, 'expire': expire,
+                'acodec': acodec}
+
+    def put(self, video_id: str, song_info: dict, expire: int = None):
+        """
+        Stores the metadata of a video, replacing the previous record.
+
+        Args:
+            video_id (str): The YouTube video id.
+            song_info (dict): The song information with title, url, duration, webpage_url and acodec.
+            expire (int): The unix time the stream URL expires at, None if unknown.
+        """
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO songs (id, title, duration, webpage_url, url, expire, acodec) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, song_info.get('title'), song_info.get('duration'), song_info.get('webpage_url'),
+                 song_info.get('url') if expire else None, expire, song_info.get('acodec') if expire else None)
+            )
+
+    def close(self):
+        """Closes the database."""
+        with self.lock:
+            self.connection.close()
+
+
+metadata_store = Metadata_store(config.METADATA_STORE_PATH) if config.METADATA_STORE_PATH else None
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import discord
+from loguru import logger
+
+import config
+
+
+class Player_renderer:
+    """
+    Renders the player message of a guild while keeping the number of Discord API calls low.
+
+    State changes (the title, the play/pause and loop buttons) only mark the message as outdated. A
+    single flush task waits `edit_delay` seconds, so changes arriving together are merged, and applies
+    the latest state with one edit. Reposting the message below new chat messages costs two calls, so
+    reposts are additionally throttled to one per `repost_interval` seconds. Only one API call is in
+    flight at a time.
+
+    Attributes:
+        message (discord.Message): The player message, None if there is none.
+        content (str): The latest text of the player message.
+        view (discord.ui.View): The view attached to the player message.
+        api_calls (int): The number of API calls made.
+        requested_calls (int): The number of API calls that rendering every change immediately would have made.
+
+    Methods:
+        send(channel, content, view): Sends a new player message.
+        request_edit(content): Schedules an edit of the player message.
+        request_repost(channel): Schedules reposting the player message to the bottom of the channel.
+        reset(): Forgets the player message and cancels pending updates.
+        stats(): Returns the call counters.
+    """
+
+    def __init__(self, edit_delay: float = config.PLAYER_EDIT_DELAY, repost_interval: float = config.PLAYER_REPOST_INTERVAL,
+                 clock=time.monotonic):
+        """
+        Initializes a new instance of the Player_renderer class.
+
+        Args:
+            edit_delay (float): The time in seconds changes are collected before the message is edited.
+            repost_interval (float): The minimal time in seconds between two reposts.
+            clock (Callable[[], float]): The clock used to throttle reposts.
+        """
+        self.edit_delay = edit_delay
+        self.repost_interval = repost_interval
+        self.clock = clock
+        self.message = None
+        self.content = None
+        self.view = None
+        self.edit_pending = False
+        self.repost_channel = None
+        self.last_repost = None
+        self.task = None
+        self.api_calls = 0
+        self.requested_calls = 0
+
+    async def send(self, channel, content: str, view: discord.ui.View = None):
+        """
+        Sends a new player message.
+
+        Args:
+            channel (discord.abc.Messageable): The channel the message is sent to.
+            content (str): The text of the message.
+            view (discord.ui.View): The view attached to the message.
+        """
+        self.content = content
+        self.view = view
+        self._count(1)
+        if view is not None:
+            self.message = await channel.send(content, view=view)
+        else:
+            self.message = await channel.send(content)
+
+    def request_edit(self, content: str = None):
+        """
+        Schedules an edit of the player message with the latest content and view state.
+
+        Args:
+            content (str): The new text of the message, None to keep the text and update the view only.
+        """
+        if self.message is None:
+            return
+        if content is not None:
+            self.content = content
+        self.edit_pending = True
+        self.requested_calls += 1
+        self._schedule()
+
+    def request_repost(self, channel):
+        """
+        Schedules deleting the player message and sending it again to the bottom of the channel.
+
+        Args:
+            channel (discord.abc.Messageable): The channel the message is sent to.
+        """
+        if self.message is None:
+            return
+        self.repost_channel = channel
+        self.requested_calls += 2
+        self._schedule()
+
+    def reset(self):
+        """Forgets the player message and cancels pending updates."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.message = None
+        self.content = None
+        self.view = None
+        self.edit_pending = False
+        self.repost_channel = None
+
+    def stats(self) -> dict:
+        """
+        Returns the call counters.
+
+        Returns:
+            dict: The number of API calls made, requested and saved.
+        """
+        return {
+            'api_calls': self.api_calls,
+            'requested_calls': self.requested_calls,
+            'saved_calls': self.requested_calls - self.api_calls,
+        }
+
+    def _count(self, calls: int):
+        self.api_calls += calls
+        self.requested_calls += calls
+
+    def _schedule(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._flush())
+
+    def _get_delay(self) -> float:
+        if self.repost_channel is None or self.last_repost is None:
+            return self.edit_delay
+        return max(self.edit_delay, self.last_repost + self.repost_interval - self.clock())
+
+    async def _flush(self):
+        while self.edit_pending or self.repost_channel is not None:
+            await asyncio.sleep(self._get_delay())
+            if self.message is None:
+                return
+            try:
+                if self.repost_channel is not None:
+                    channel, self.repost_channel = self.repost_channel, None
+                    self.edit_pending = False
+                    await self._repost(channel)
+                else:
+                    self.edit_pending = False
+                    await self._edit()
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to update player message\n {e}")
+        logger.debug(f"Player message rendered, {self.stats()}")
+
+    async def _edit(self):
+        self.api_calls += 1
+        if self.view is not None:
+            await self.message.edit(content=self.content, view=self.view)
+        else:
+            await self.message.edit(content=self.content)
+
+    async def _repost(self, channel):
+        self.last_repost = self.clock()
+        self.api_calls += 2
+        try:
+            await self.message.delete()
+        except discord.NotFound:
+            logger.warning(f"Failed to delete message, message not found")
+        if self.view is not None:
+            self.message = await channel.send(self.content, view=self.view)
+        else:
+            self.message = await channel.send(self.content)
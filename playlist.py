@@ -1,46 +1,115 @@
+import random
+import threading
 from io import StringIO
 
 from loguru import logger
 
+from duration_index import Duration_index, format_duration
 from song import Song
 
 
 class Playlist:
     """
-    A doubly linked list implementation to store and manage a playlist of songs.
+    An array-backed playlist of songs with a cursor pointing to the current song.
+
+    Songs are kept in a list, so appending and looking a song up by its position take O(1), and the
+    cursor moves over the songs without losing the start of the queue. Reordering operations are
+    list slice operations, which run in C and stay in the microsecond range on queues of tens of
+    thousands of songs.
+
+    The playlist is shared between the event loop and background threads, so every operation takes
+    the playlist lock. Bulk insertion with `extend` takes it once per batch, and `snapshot` gives readers
+    a consistent copy of the songs and the cursor.
+
+    The durations of the songs are kept in a Duration_index, so the remaining time and the time until
+    any song starts are answered in O(log n). Appending updates the index in place, other changes of
+    the order mark it stale and it is rebuilt on the next query.
 
     Attributes:
-        head (Song): The first song in the playlist.
+        songs (list): The songs of the playlist in playing order.
+        cursor (int): The position of the current song.
+        head (Song): The current song.
         tail (Song): The last song in the playlist.
         size (int): The number of songs in the playlist.
+        version (int): Incremented on every change of the songs or the cursor.
+        lock (threading.RLock): Guards the songs and the cursor.
+        durations (Duration_index): The prefix sums of the song durations.
 
     Methods:
-        push_song(self, song): Adds a song to the beginning of the playlist.
+        push_song(self, song): Inserts a song before the current one and makes it the current song.
         append_song(self, song): Adds a song to the end of the playlist.
-        next_song(self): Returns the URL of the next song in the playlist.
-        previous_song(self): Returns the URL of the previous song in the playlist.
+        extend(self, songs): Adds several songs to the end of the playlist at once.
+        insert_song(self, index, song): Inserts a song at the given position.
+        remove_song(self, index): Removes the song at the given position.
+        remove_range(self, start, stop): Removes the songs between two positions.
+        move_song(self, source, destination): Moves a song to another position.
+        shuffle(self): Shuffles the songs after the current one.
+        jump(self, index): Makes the song at the given position the current one.
+        update_song_duration(self, song): Updates the duration index after a song was resolved.
+        remaining_time(self): Returns the duration of the current song and the songs after it.
+        starts_in(self, index): Returns the time until the song at the given position starts.
+        next_song(self): Moves the cursor to the next song and returns it.
+        previous_song(self): Moves the cursor to the previous song and returns it.
+        peek_next_song(self): Returns the next song without moving the cursor.
+        snapshot(self): Returns a consistent copy of the songs and the cursor.
+        print_page(self, start, count): Returns a string representation of a window of the playlist.
         print_playlist(self): Returns a string representation of the playlist.
     """
 
     def __init__(self):
         """Initializes a new instance of the Playlist class."""
-        self.head = None
-        self.tail = None
-        self.size = 0
+        self.songs = []
+        self.cursor = 0
+        self.version = 0
+        self.lock = threading.RLock()
+        self.durations = Duration_index()
+        self.durations_stale = False
+        self.pages = {}
+        self.pages_version = self.version
         logger.debug("initializing playlist")
 
+    def __len__(self):
+        return len(self.songs)
+
+    def __getitem__(self, index: int) -> Song:
+        with self.lock:
+            return self.songs[index]
+
+    def __iter__(self):
+        return iter(self.snapshot()[0])
+
+    @property
+    def size(self) -> int:
+        """int: The number of songs in the playlist."""
+        return len(self.songs)
+
+    @property
+    def head(self):
+        """Song: The current song, None if the playlist is empty."""
+        with self.lock:
+            if self.cursor < len(self.songs):
+                return self.songs[self.cursor]
+            return None
+
+    @property
+    def tail(self):
+        """Song: The last song in the playlist, None if the playlist is empty."""
+        with self.lock:
+            if self.songs:
+                return self.songs[-1]
+            return None
+
     def push_song(self, song: Song):
         """
-        Adds a song to the beginning of the playlist.
+        Inserts a song before the current one and makes it the current song.
 
         Args:
             song (Song): The song to be added.
         """
-        song.next = self.head
-        if self.head is not None:
-            self.head.prev = song
-        self.head = song
-        self.size += 1
+        with self.lock:
+            self.songs.insert(self.cursor, song)
+            self.durations_stale = True
+            self.version += 1
         logger.debug("Song pushed")
 
     def append_song(self, song: Song):
@@ -50,21 +119,216 @@ class Playlist:
         Args:
             song (Song): The song to be added.
         """
-        song.next = None
-        if self.head is None:
-            song.prev = None
-            self.head = song
-            logger.debug(f"Add first song {song.title} to playlist")
-            self.size = 1
-            return
-        last = self.head
-        while last.next is not None:
-            last = last.next
-        last.next = song
-        song.prev = last
-        self.size += 1
+        with self.lock:
+            self.songs.append(song)
+            if not self.durations_stale:
+                self.durations.append(song.duration)
+            self.version += 1
         logger.debug(f"Add {song.title} to playlist")
 
+    def extend(self, songs):
+        """
+        Adds several songs to the end of the playlist at once.
+
+        The lock is taken once for the whole batch, so readers see either none or all of the songs.
+
+        Args:
+            songs (Iterable[Song]): The songs to be added.
+        """
+        songs = list(songs)
+        if not songs:
+            return
+        with self.lock:
+            self.songs.extend(songs)
+            if not self.durations_stale:
+                for song in songs:
+                    self.durations.append(song.duration)
+            self.version += 1
+        logger.debug(f"Add {len(songs)} songs to playlist")
+
+    def insert_song(self, index: int, song: Song):
+        """
+        Inserts a song at the given position, the current song stays current.
+
+        Args:
+            index (int): The position of the new song.
+            song (Song): The song to be added.
+        """
+        with self.lock:
+            index = max(0, min(index, len(self.songs)))
+            self.songs.insert(index, song)
+            if index <= self.cursor and len(self.songs) > 1:
+                self.cursor += 1
+            self.durations_stale = True
+            self.version += 1
+        logger.debug(f"Insert {song.title} at {index}")
+
+    def remove_song(self, index: int) -> Song:
+        """
+        Removes the song at the given position.
+
+        If the current song is removed, the song after it becomes the current one.
+
+        Args:
+            index (int): The position of the song.
+
+        Returns:
+            Song: The removed song.
+        """
+        with self.lock:
+            if index < 0:
+                index += len(self.songs)
+            song = self.songs.pop(index)
+            if index < self.cursor or (self.cursor == len(self.songs) and self.cursor > 0):
+                self.cursor -= 1
+            self.durations_stale = True
+            self.version += 1
+        logger.debug(f"Remove {song.title} from playlist")
+        return song
+
+    def remove_range(self, start: int, stop: int) -> list:
+        """
+        Removes the songs between two positions.
+
+        If the current song is removed, the song after the removed ones becomes the current one.
+
+        Args:
+            start (int): The position of the first song to be removed.
+            stop (int): The position after the last song to be removed.
+
+        Returns:
+            list: The removed songs.
+        """
+        with self.lock:
+            start = max(0, start)
+            stop = min(stop, len(self.songs))
+            if start >= stop:
+                return []
+            removed = self.songs[start:stop]
+            del self.songs[start:stop]
+            if self.cursor >= stop:
+                self.cursor -= stop - start
+            elif self.cursor >= start:
+                self.cursor = start
+            self.cursor = max(0, min(self.cursor, len(self.songs) - 1))
+            self.durations_stale = True
+            self.version += 1
+        logger.debug(f"Remove {len(removed)} songs from playlist")
+        return removed
+
+    def move_song(self, source: int, destination: int):
+        """
+        Moves a song to another position, the current song stays current.
+
+        Args:
+            source (int): The position of the song.
+            destination (int): The new position of the song.
+        """
+        with self.lock:
+            current = self.head
+            song = self.songs.pop(source)
+            destination = max(0, min(destination, len(self.songs)))
+            self.songs.insert(destination, song)
+            if current is not None:
+                if song is current:
+                    self.cursor = destination
+                elif source < self.cursor <= destination:
+                    self.cursor -= 1
+                elif destination <= self.cursor < source:
+                    self.cursor += 1
+            self.durations_stale = True
+            self.version += 1
+        logger.debug(f"Move {song.title} from {source} to {destination}")
+
+    def shuffle(self, rng: random.Random = random):
+        """
+        Shuffles the songs after the current one, the current song and the songs before it stay in place.
+
+        Args:
+            rng (random.Random): The random number generator to be used.
+        """
+        with self.lock:
+            upcoming = self.songs[self.cursor + 1:]
+            rng.shuffle(upcoming)
+            self.songs[self.cursor + 1:] = upcoming
+            self.durations_stale = True
+            self.version += 1
+        logger.debug(f"Shuffle {len(upcoming)} songs")
+
+    def jump(self, index: int):
+        """
+        Makes the song at the given position the current one.
+
+        Args:
+            index (int): The position of the song.
+
+        Returns:
+            song (Song): The new current song, None if there is no song at the position.
+        """
+        with self.lock:
+            if not 0 <= index < len(self.songs):
+                logger.debug(f"There is no song at {index} in the playlist")
+                return None
+            self.cursor = index
+            self.version += 1
+            logger.debug(f"Changing head to song at {index}")
+            return self.songs[index]
+
+    def update_song_duration(self, song: Song):
+        """
+        Updates the duration index after the duration of a song became known.
+
+        Songs are resolved around the cursor, so only the current and the next song are looked up,
+        the index is rebuilt on the next query if the song is somewhere else.
+
+        Args:
+            song (Song): The resolved song.
+        """
+        with self.lock:
+            if self.durations_stale:
+                return
+            for index in (self.cursor, self.cursor + 1):
+                if index < len(self.songs) and self.songs[index] is song:
+                    if self.durations.values[index] != (song.duration or 0):
+                        self.durations.update(index, song.duration)
+                        self.version += 1
+                    return
+            self.durations_stale = True
+            self.version += 1
+
+    def _get_durations(self) -> Duration_index:
+        if self.durations_stale:
+            self.durations.rebuild(song.duration for song in self.songs)
+            self.durations_stale = False
+        return self.durations
+
+    def remaining_time(self) -> int:
+        """
+        Returns the duration of the current song and the songs after it.
+
+        Returns:
+            int: The remaining time in seconds, songs with an unknown duration count as 0.
+        """
+        with self.lock:
+            durations = self._get_durations()
+            return durations.total() - durations.prefix(self.cursor)
+
+    def starts_in(self, index: int):
+        """
+        Returns the time until the song at the given position starts, counted from the start of the current song.
+
+        Args:
+            index (int): The position of the song.
+
+        Returns:
+            Union[int, None]: The time in seconds, None if the song is before the current one or doesn't exist.
+        """
+        with self.lock:
+            if not self.cursor <= index < len(self.songs):
+                return None
+            durations = self._get_durations()
+            return durations.prefix(index) - durations.prefix(self.cursor)
+
     def next_song(self):
         """
         Returns the next song in the playlist.
@@ -72,12 +336,14 @@ class Playlist:
         Returns:
             song (Song): The next song in the playlist.
         """
-        if self.head.next is None:
-            logger.debug("There is no next song in the playlist")
-            return None
-        self.head = self.head.next
-        logger.debug("Changing head to next song in the playlist")
-        return self.head
+        with self.lock:
+            if self.cursor + 1 >= len(self.songs):
+                logger.debug("There is no next song in the playlist")
+                return None
+            self.cursor += 1
+            self.version += 1
+            logger.debug("Changing head to next song in the playlist")
+            return self.songs[self.cursor]
 
     def previous_song(self):
         """
@@ -86,12 +352,76 @@ class Playlist:
         Returns:
             song (Song): The previous song in the playlist.
         """
-        if self.head.prev is None:
-            logger.debug("There is no previous song in the playlist")
+        with self.lock:
+            if self.cursor == 0 or not self.songs:
+                logger.debug("There is no previous song in the playlist")
+                return None
+            self.cursor -= 1
+            self.version += 1
+            logger.debug("Changing head to previous song in the playlist")
+            return self.songs[self.cursor]
+
+    def peek_next_song(self):
+        """
+        Returns the next song without moving the cursor.
+
+        Returns:
+            song (Song): The next song in the playlist, None if the current song is the last one.
+        """
+        with self.lock:
+            if self.cursor + 1 < len(self.songs):
+                return self.songs[self.cursor + 1]
             return None
-        self.head = self.head.prev
-        logger.debug("Changing head to previous song in the playlist")
-        return self.head
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of the songs and the cursor.
+
+        Returns:
+            tuple: The list of songs and the position of the current song.
+        """
+        with self.lock:
+            return list(self.songs), self.cursor
+
+    def print_page(self, start: int, count: int) -> str:
+        """
+        Returns a string representation of a window of the playlist.
+
+        Only the songs in the window are rendered, the time until the first of them starts comes from
+        the duration index. Rendered windows are cached until the playlist changes.
+
+        Args:
+            start (int): The position of the first song in the window.
+            count (int): The number of songs in the window.
+
+        Returns:
+            str: A string representation of the songs in the window.
+        """
+        with self.lock:
+            if self.pages_version != self.version:
+                self.pages.clear()
+                self.pages_version = self.version
+            page = self.pages.get((start, count))
+            if page is not None:
+                return page
+
+            songs = self.songs[start:start + count]
+            cursor = self.cursor
+            ss = StringIO()
+            ss.write(f"\tPlaylist: {len(self.songs)} songs, {format_duration(self.remaining_time())} left\n")
+            starts_in = self.starts_in(max(start, cursor)) or 0
+            for index, song in enumerate(songs, start):
+                if index == cursor:
+                    ss.write(f"> {index + 1}. {song.title}\n")
+                elif index > cursor:
+                    ss.write(f"  {index + 1}. {song.title} (in {format_duration(starts_in)})\n")
+                else:
+                    ss.write(f"  {index + 1}. {song.title}\n")
+                if index >= cursor:
+                    starts_in += song.duration or 0
+            page = ss.getvalue()
+            self.pages[(start, count)] = page
+            return page
 
     def print_playlist(self):
         """
@@ -100,11 +430,4 @@ class Playlist:
         Returns:
             str: A string representation of the playlist.
         """
-        ss = StringIO()
-        ss.write("\tPlaylist:\n")
-        pointer = self.head
-        while pointer is not None:
-            ss.write(f"{pointer.title}\n")
-            last = pointer
-            pointer = pointer.next
-        return ss.getvalue()
+        return self.print_page(0, self.size)
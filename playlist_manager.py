@@ -1,13 +1,23 @@
+import asyncio
 import itertools
 import re
 import threading
+import time
+from collections import deque
 from queue import Queue
 
 from loguru import logger
 
+import config
+from cache import song_cache
 from downloader import Youtube_downloader
+from metadata_store import metadata_store
 from playlist import Playlist
-from song import Song
+from resolver import resolver
+from song import Song, intern
+
+format_metrics = {'tracks': 0, 'bytes_saved': 0}
+format_metrics_lock = threading.Lock()
 
 
 class Playlist_manager():
@@ -15,15 +25,23 @@ class Playlist_manager():
     def __init__(self):
         self.downloader = Youtube_downloader()
         self.time_to_shutdown = False
+        self.expansion_task = None
+        self.expansion_concurrency = config.PLAYLIST_EXPANSION_CONCURRENCY
+        self.target_bitrate = None
 
     # push song to playlist
 
-    def create_song(self, url: str):
+    def create_song(self, url: str, use_cache: bool = True, require_stream_url: bool = False):
         """
         Downloads and extracts information about a song from a given URL, creates Song objects and returns it.
 
+        A song whose stored stream URL has expired is created flat from the stored metadata, its stream URL
+        is resolved when it is played.
+
         Args:
             url (str): The URL of the song or playlist to be downloaded and extracted.
+            use_cache (bool): Look the song up in the cache and the metadata store before extracting it.
+            require_stream_url (bool): Extract the song again if only its metadata is stored.
 
         Returns:
             Song: Returns a Song object
@@ -31,51 +49,290 @@ class Playlist_manager():
         Example:
             create_song('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
         """
+        cache_key = self.get_cache_key(url)
+        song_info = self._lookup_song_info(cache_key) if cache_key and use_cache else None
+        if song_info is not None and (song_info['url'] or not require_stream_url):
+            logger.debug(f"Song {song_info['title']} found in cache")
+            return self._create_song_from_info(song_info)
         try:
-            song_info = self.downloader.downloader.extract_info(url, download=False)
-            song = Song()
-            song.title = song_info.get('title')
-            song.url = song_info.get('url')
-            song.duration = song_info.get('duration')
-            logger.debug(f'New song: {song.title} with duration: {song.duration} are created')
-            return song
+            info = self.downloader.downloader.extract_info(url, download=False)
+            song_info = {
+                'title': intern(info.get('title')),
+                'url': info.get('url'),
+                'duration': info.get('duration'),
+                'id': intern(info.get('id')),
+                'webpage_url': info.get('webpage_url') or url,
+                'expire': Youtube_downloader.get_stream_url_expiry(info.get('url')),
+                'acodec': info.get('acodec'),
+                'formats': Youtube_downloader.get_audio_formats(info),
+            }
         except Exception as e:
             logger.warning(f"Can't extract info from {url}\n {e}")
             return None
+        if cache_key and song_info['url']:
+            self._store_song_info(cache_key, song_info)
+        song = self._create_song_from_info(song_info)
+        logger.debug(f'New song: {song.title} with duration: {song.duration} are created')
+        return song
+
+    def _create_song_from_info(self, song_info: dict) -> Song:
+        """
+        Creates a song, streaming the cheapest audio format that meets the target bitrate if one is set.
+
+        Args:
+            song_info (dict): The song information, optionally with the audio formats of the video.
+
+        Returns:
+            Song: The created song.
+        """
+        song_info = dict(song_info)
+        formats = song_info.pop('formats', None)
+        if not formats or not self.target_bitrate or not config.MATCH_CHANNEL_BITRATE:
+            return Song(**song_info)
+
+        audio_format = Youtube_downloader.select_audio_format(formats, self.target_bitrate)
+        default_format = next((audio_format for audio_format in formats if audio_format['url'] == song_info['url']),
+                              max(formats, key=lambda audio_format: audio_format['abr']))
+        bytes_saved = self._estimate_stream_size(default_format, song_info['duration']) - \
+            self._estimate_stream_size(audio_format, song_info['duration'])
+        with format_metrics_lock:
+            format_metrics['tracks'] += 1
+            format_metrics['bytes_saved'] += bytes_saved
+        logger.debug(
+            f"Format {audio_format['format_id']} ({audio_format['acodec']}, {audio_format['abr']:.0f} kbps) selected for "
+            f"{song_info['title']} at {self.target_bitrate} kbps, {bytes_saved} bytes saved, {format_metrics}"
+        )
+        song_info.update(
+            url=audio_format['url'],
+            acodec=audio_format['acodec'],
+            expire=Youtube_downloader.get_stream_url_expiry(audio_format['url']) or song_info['expire'],
+        )
+        return Song(**song_info)
+
+    @staticmethod
+    def _estimate_stream_size(audio_format: dict, duration) -> int:
+        """
+        Returns the size of an audio format, estimated from its bitrate if yt-dlp doesn't know it.
+
+        Args:
+            audio_format (dict): The audio format.
+            duration (int): The duration of the song in seconds.
 
-    async def add_song(self, url: str, playlist: Playlist):
-        thread = threading.Thread(target=self._add_song, args=(url, playlist))
-        thread.start()
-        thread.join()
+        Returns:
+            int: The size in bytes.
+        """
+        if audio_format['filesize']:
+            return int(audio_format['filesize'])
+        return int(audio_format['abr'] * 1000 / 8 * (duration or 0))
 
-    async def add_playlist(self, url: str, playlist: Playlist, limit = None):
-        
-        playlist_info = self.downloader.downloader.extract_info(url, download=False, process=False)
-        if 'entries' not in playlist_info: 
+    @staticmethod
+    def _lookup_song_info(cache_key: str):
+        """
+        Looks up resolved song information in the memory cache, then in the persistent store.
+
+        Args:
+            cache_key (str): The video id of the song.
+
+        Returns:
+            Union[dict, None]: The song information, with url set to None if the stored stream URL has expired,
+            or None if the song is unknown.
+        """
+        song_info = song_cache.get(cache_key)
+        if song_info is not None or metadata_store is None:
+            return song_info
+        song_info = metadata_store.get(cache_key)
+        if song_info is not None and song_info['url'] is not None:
+            song_cache.put(cache_key, song_info, ttl=Playlist_manager._get_cache_ttl(song_info['expire']))
+        return song_info
+
+    @staticmethod
+    def _store_song_info(cache_key: str, song_info: dict):
+        """
+        Saves resolved song information in the memory cache and in the persistent store.
+
+        Args:
+            cache_key (str): The video id of the song.
+            song_info (dict): The song information.
+        """
+        song_cache.put(cache_key, song_info, ttl=Playlist_manager._get_cache_ttl(song_info['expire']))
+        if metadata_store is not None:
+            metadata_store.put(cache_key, song_info, song_info['expire'])
+
+    @staticmethod
+    def _get_cache_ttl(expire):
+        """
+        Returns the time to live of a cache entry, so that cached stream URLs are dropped before they expire.
+
+        Args:
+            expire (int): The unix time the stream URL expires at, None if unknown.
+
+        Returns:
+            float: The time to live in seconds.
+        """
+        if expire is None:
+            return config.SONG_CACHE_TTL
+        return max(0, min(config.SONG_CACHE_TTL, expire - time.time() - config.STREAM_URL_EXPIRY_MARGIN))
+
+    @staticmethod
+    def get_cache_key(url: str):
+        """
+        Returns the canonical video id of a URL, used as the key of the song cache.
+
+        Args:
+            url (str): The URL of the song.
+
+        Returns:
+            Union[str, None]: The video id, or None if the URL has no video id.
+        """
+        parsed_url = Youtube_downloader.parse_youtube_url(url)
+        return parsed_url.video_id if parsed_url is not None else None
+
+    @staticmethod
+    def create_flat_song(entry: dict):
+        """
+        Creates a flat Song object from a playlist entry without any network request.
+
+        Args:
+            entry (dict): A playlist entry extracted with extract_flat.
+
+        Returns:
+            Song: Returns a flat Song object, or None if the entry has no title.
+        """
+        if not entry.get('title'):
+            return None
+        webpage_url = entry.get('url')
+        if entry.get('id') and not (webpage_url or '').startswith('http'):
+            webpage_url = f"https://www.youtube.com/watch?v={entry['id']}"
+        return Song(title=entry.get('title'), duration=entry.get('duration'), id=entry.get('id'), webpage_url=webpage_url)
+
+    async def resolve_song(self, song: Song, refresh: bool = False) -> bool:
+        """
+        Resolves the stream URL of a flat song, or of a song whose stream URL is about to expire.
+
+        Args:
+            song (Song): The song to be resolved.
+            refresh (bool): Resolve a new stream URL even if the current one looks valid, e.g. after it was rejected.
+
+        Returns:
+            bool: True if the song has a valid stream URL, False if it can't be resolved.
+        """
+        if not refresh and not song.is_flat and not song.expires_within(config.STREAM_URL_EXPIRY_MARGIN):
+            return True
+        if not song.is_flat:
+            logger.debug(f"Refreshing stream url of {song.title}")
+            refresh = True
+        resolved = await resolver.run(self.create_song, song.webpage_url, use_cache=not refresh, require_stream_url=True)
+        if resolved is None or resolved.url is None:
             return False
-             
-        thread = threading.Thread(target=self._add_first_playlist_song, args=(playlist_info, playlist))
-        thread.start() # wait until first song in playlist
-        thread.join() # audio start playing in audiocontroller
-        thread = threading.Thread(target=self._add_other_playlist, args=(playlist_info, playlist, limit)) #add other songs in the playlist, laggy, try to find another solution
-        thread.start()
-
-    def _add_first_playlist_song(self, playlist_info, playlist: Playlist):
-        for song in itertools.islice(playlist_info['entries'], 1):
-            song = self.create_song(song.get('url'))
-            if song:
-                playlist.append_song(song)
+        song.url = resolved.url
+        song.expire = resolved.expire
+        song.acodec = resolved.acodec
+        song.title = song.title or resolved.title
+        song.duration = song.duration or resolved.duration
+        song.id = song.id or resolved.id
+        logger.debug(f"Resolved stream url of {song.title}")
+        return True
+
+    async def add_song(self, url: str, playlist: Playlist) -> bool:
+        """
+        Extracts a song and appends it to the playlist.
+
+        The extraction doubles as validation: a video that is unavailable, private or removed can't be
+        extracted, so no separate request for the video page is needed.
+
+        Args:
+            url (str): The URL of the video.
+            playlist (Playlist): The playlist the song is appended to.
+
+        Returns:
+            bool: True if the song was added, False if the video is unavailable.
+        """
+        song = await resolver.run(self.create_song, url)
+        if song is None:
+            return False
+        playlist.append_song(song)
+        return True
 
-    def _add_song(self, url: str, playlist: Playlist):
-        song = self.create_song(url)
-        if song:
-            playlist.append_song(song)
+    async def add_playlist(self, url: str, playlist: Playlist, limit = None) -> bool:
+        """
+        Appends the first song of a playlist and starts adding the other songs in the background.
+
+        Args:
+            url (str): The URL of the playlist or mix.
+            playlist (Playlist): The playlist the songs are appended to.
+            limit (int): The maximum number of songs to be added after the first one, None for no limit.
 
-    def _add_other_playlist(self, playlist_info, playlist: Playlist, limit = None):
-        for song in itertools.islice(playlist_info['entries'], 0, limit):
+        Returns:
+            bool: True if the first song was added, False if the playlist is unavailable or empty.
+        """
+        playlist_info = await resolver.run(self.downloader.downloader.extract_info, url, download=False, process=False)
+        if not playlist_info or 'entries' not in playlist_info:
+            return False
+
+        song = await resolver.run(self._get_first_playlist_song, playlist_info) # wait until first song in playlist, audio start playing in audiocontroller
+        if song is None:
+            return False
+        playlist.append_song(song)
+        self.expansion_task = asyncio.ensure_future(self._add_other_playlist(playlist_info, playlist, limit)) # add other songs in the background
+        return True
+
+    def _get_first_playlist_song(self, playlist_info):
+        for entry in itertools.islice(playlist_info['entries'], 1):
+            return self.create_flat_song(entry) or self.create_song(entry.get('url'))
+        return None
+
+    async def _add_other_playlist(self, playlist_info, playlist: Playlist, limit = None):
+        """
+        Appends the remaining playlist entries to the playlist in their original order.
+
+        Entries that already carry a title are queued as flat songs without a network request. The
+        others are resolved concurrently, up to `expansion_concurrency` at the same time, and a song is
+        appended as soon as it and every entry before it are ready, so the playlist fills up front to back.
+        Songs that are ready together are appended as one batch. The entries are pulled one at a time,
+        so the songs of the first page are queued before the next page of a long playlist is fetched.
+
+        Args:
+            playlist_info (dict): The playlist information returned by extract_info with process=False.
+            playlist (Playlist): The playlist the songs are appended to.
+            limit (int): The maximum number of entries to be added, None for no limit.
+        """
+        entries = itertools.islice(playlist_info['entries'], 0, limit)
+        pending = deque()
+        exhausted = False
+
+        async def fill_window():
+            nonlocal exhausted
+            while not exhausted and len(pending) < self.expansion_concurrency:
+                entry = await resolver.run(next, entries, None)  # may fetch the next page of the playlist
+                if entry is None:
+                    exhausted = True
+                    return
+                song = self.create_flat_song(entry)
+                pending.append(song if song else resolver.submit(self.create_song, entry.get('url')))
+
+        await fill_window()
+        while pending:
             if self.time_to_shutdown:  # kill when audio_controller is resetting
                 self.time_to_shutdown = False
+                for future in pending:
+                    if not isinstance(future, Song):
+                        future.cancel()
+                close = getattr(playlist_info['entries'], 'close', None)
+                if close is not None:  # returns the extractor the lazy entries hold
+                    await resolver.run(close)
                 return
-            song = self.create_song(song.get('url'))
-            if song:    
+            batch = []
+            while pending and (isinstance(pending[0], Song) or pending[0].done()):
+                song = pending.popleft()
+                if not isinstance(song, Song):
+                    song = song.result()
+                if song:
+                    batch.append(song)
+            if batch:
+                playlist.extend(batch)
+                await fill_window()
+                continue
+            song = await pending.popleft()
+            if song:
                 playlist.append_song(song)
+            await fill_window()
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+import config
+
+
+class Metadata_resolver:
+    """
+    Runs blocking yt-dlp calls outside of the event loop.
+
+    All extraction work of the process goes through one bounded thread pool, and the number of
+    calls that may be in flight at once is limited by a semaphore, so a slow extraction never
+    blocks gateway heartbeats or the commands of other guilds.
+
+    Attributes:
+        executor (ThreadPoolExecutor): The thread pool the blocking calls are executed in.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent calls.
+
+    Methods:
+        run(func, *args, **kwargs): Runs a blocking function in the executor and awaits its result.
+        submit(func, *args, **kwargs): Schedules a blocking function and returns an awaitable future.
+        shutdown(): Shuts the executor down.
+    """
+
+    def __init__(self, max_workers: int = config.RESOLVER_MAX_WORKERS, max_concurrency: int = config.RESOLVER_MAX_CONCURRENCY):
+        """
+        Initializes the resolver.
+
+        Args:
+            max_workers (int): The number of threads in the executor.
+            max_concurrency (int): The maximum number of calls running or waiting in the executor.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resolver")
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a blocking function in the executor without blocking the event loop.
+
+        Args:
+            func (Callable): The blocking function to be called.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Any: The result of the function.
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def submit(self, func, *args, **kwargs) -> asyncio.Task:
+        """
+        Schedules a blocking function in the executor.
+
+        Args:
+            func (Callable): The blocking function to be called.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            asyncio.Task: A task that resolves to the result of the function.
+        """
+        return asyncio.ensure_future(self.run(func, *args, **kwargs))
+
+    def shutdown(self):
+        """
+        Shuts the executor down without waiting for pending calls.
+        """
+        logger.debug("Shutting down metadata resolver")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+resolver = Metadata_resolver()
@@ -1,24 +1,147 @@
+import sys
+import time
+
+
 class Song:
     """Represents a single song.
 
+    A song without a stream URL is "flat": it only carries the data a playlist listing provides
+    (video id, title and duration) and its stream URL is resolved right before playback.
+
+    Songs are slotted, since a long queue keeps many of them alive. Titles and video ids are interned,
+    so the same song queued in several guilds shares them with the metadata cache. The stream URL and
+    other optional fields live in a dictionary that is only created once one of them is set, and the
+    webpage URL is derived from the video id unless it differs from the standard one.
+
     Attributes:
         title (str): The title of the song.
-        url (str): The URL of the song.
+        url (str): The stream URL of the song, None while the song is flat.
         duration (int): The duration of the song in seconds.
-        next (Song): The next song in the playlist.
-        prev (Song): The previous song in the playlist.
+        id (str): The YouTube video id of the song.
+        webpage_url (str): The URL of the video page, used to resolve the stream URL.
+        expire (int): The unix time the stream URL expires at, None if unknown.
+        acodec (str): The audio codec of the stream, None if unknown.
     """
 
-    def __init__(self, title=None, url=None, duration=None):
+    __slots__ = ("title", "duration", "id", "_extra")
+
+    def __init__(self, title=None, url=None, duration=None, id=None, webpage_url=None, expire=None, acodec=None):
         """Initializes a new instance of the Song class.
 
         Args:
             title (str): The title of the song.
-            url (str): The URL of the song.
+            url (str): The stream URL of the song.
             duration (int): The duration of the song in seconds.
+            id (str): The YouTube video id of the song.
+            webpage_url (str): The URL of the video page.
+            expire (int): The unix time the stream URL expires at.
+            acodec (str): The audio codec of the stream.
         """
-        self.title = title
-        self.url = url
+        self.title = intern(title)
         self.duration = duration
-        self.next = None
-        self.prev = None
+        self.id = intern(id)
+        self._extra = None
+        self.url = url
+        self.expire = expire
+        self.webpage_url = webpage_url
+        self.acodec = acodec
+
+    def _get_extra(self, name: str):
+        if self._extra is None:
+            return None
+        return self._extra.get(name)
+
+    def _set_extra(self, name: str, value):
+        if value is None:
+            if self._extra is not None:
+                self._extra.pop(name, None)
+                if not self._extra:
+                    self._extra = None
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[name] = value
+
+    @property
+    def url(self):
+        """str: The stream URL of the song, None while the song is flat."""
+        return self._get_extra('url')
+
+    @url.setter
+    def url(self, value):
+        self._set_extra('url', value)
+
+    @property
+    def expire(self):
+        """int: The unix time the stream URL expires at, None if unknown."""
+        return self._get_extra('expire')
+
+    @expire.setter
+    def expire(self, value):
+        self._set_extra('expire', value)
+
+    @property
+    def acodec(self):
+        """str: The audio codec of the stream, None if unknown."""
+        return self._get_extra('acodec')
+
+    @acodec.setter
+    def acodec(self, value):
+        self._set_extra('acodec', intern(value))
+
+    @property
+    def webpage_url(self):
+        """str: The URL of the video page, the standard watch URL of the video id unless another one was set."""
+        webpage_url = self._get_extra('webpage_url')
+        if webpage_url is None and self.id is not None:
+            return watch_url(self.id)
+        return webpage_url
+
+    @webpage_url.setter
+    def webpage_url(self, value):
+        if self.id is not None and value == watch_url(self.id):
+            value = None
+        self._set_extra('webpage_url', value)
+
+    @property
+    def is_flat(self) -> bool:
+        """bool: True if the stream URL of the song is not resolved yet."""
+        return self.url is None
+
+    def expires_within(self, seconds: float) -> bool:
+        """Returns True if the stream URL of the song expires within the given number of seconds.
+
+        Args:
+            seconds (float): The time span to be checked.
+
+        Returns:
+            bool: True if the stream URL expires within the time span, False if it doesn't or the expiry time is unknown.
+        """
+        expire = self.expire
+        return expire is not None and expire - time.time() <= seconds
+
+
+def intern(value):
+    """Returns the interned copy of a string, any other value is returned as is.
+
+    Args:
+        value: The value to be interned.
+
+    Returns:
+        The interned string or the value itself.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def watch_url(video_id: str) -> str:
+    """Returns the standard YouTube watch URL of a video.
+
+    Args:
+        video_id (str): The YouTube video id.
+
+    Returns:
+        str: The watch URL.
+    """
+    return f"https://www.youtube.com/watch?v={video_id}"
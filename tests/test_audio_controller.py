@@ -0,0 +1,354 @@
+import asyncio
+import time
+
+import discord
+import pytest
+import pytest_asyncio
+
+import config
+from audio_controller import Audio_controller, PlaylistView
+from frame_cache import Cached_audio_source, frame_cache
+from playlist import Playlist
+from song import Song
+
+RESOLVE_LATENCY = 0.2
+
+
+class Fake_message:
+
+    def __init__(self, content):
+        self.content = content
+
+    async def edit(self, content=None, view=None):
+        if content is not None:
+            self.content = content
+
+    async def delete(self):
+        pass
+
+
+class Fake_channel:
+
+    async def send(self, content, view=None):
+        return Fake_message(content)
+
+
+class Fake_voice_client:
+
+    def __init__(self):
+        self.started = []
+        self.after = None
+
+    def play(self, source, after=None):
+        self.started.append((time.perf_counter(), source))
+        self.after = after
+
+    def finish(self):
+        """Imitates the end of the current track, the way the audio player thread does it."""
+        finished_at = time.perf_counter()
+        self.after(None)
+        return finished_at
+
+
+class Fake_context:
+
+    def __init__(self):
+        self.voice_client = Fake_voice_client()
+        self.channel = Fake_channel()
+
+
+class Fake_bot:
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+
+class Fake_source(discord.AudioSource):
+
+    def __init__(self, song, forbidden=False):
+        self.song = song
+        self.forbidden = forbidden
+        self.cleaned_up = False
+
+    def is_forbidden(self):
+        return self.forbidden
+
+    def read(self):
+        return b''
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+class Frame_source(Fake_source):
+
+    def __init__(self, song):
+        super().__init__(song)
+        self.frames = [b"frame"] * 100
+
+    def read(self):
+        return self.frames.pop() if self.frames else b""
+
+
+async def resolve_instantly(song, refresh=False):
+    return True
+
+
+async def resolve_slowly(song, refresh=False):
+    await asyncio.sleep(RESOLVE_LATENCY)
+    return True
+
+
+@pytest_asyncio.fixture
+async def controller(request, monkeypatch):
+    """
+    An audio controller that plays fake audio sources of a playlist of songs.
+
+    Parameterize it indirectly with a dict to change the defaults: `songs` is the number of songs in the
+    playlist, `prefetch` turns on the prefetching of the next song and `resolve` replaces the resolver.
+    """
+    options = {'songs': 3, 'prefetch': False, 'resolve': resolve_instantly, **getattr(request, "param", {})}
+    monkeypatch.setattr(config, "PREFETCH_NEXT_SONG", options['prefetch'])
+    controller = Audio_controller(Fake_bot())
+    controller.playlist_manager.resolve_song = options['resolve']
+    controller.create_audio_source = Fake_source
+    controller.playlist = Playlist()
+    controller.playlist.extend(Song(title=f"song {i}", id=str(i), url=f"https://stream/{i}") for i in range(options['songs']))
+    return controller
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [
+    {'songs': 2, 'resolve': resolve_slowly, 'prefetch': False},
+    {'songs': 2, 'resolve': resolve_slowly, 'prefetch': True},
+], indirect=True, ids=["cold", "prefetched"])
+async def test_prefetch_reduces_gap_between_songs(controller) -> None:
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    if controller.prefetch_task is not None:
+        await controller.prefetch_task
+
+    finished_at = ctx.voice_client.finish()
+    while len(ctx.voice_client.started) < 2:
+        await asyncio.sleep(0.001)
+    started_at, source = ctx.voice_client.started[1]
+    assert source.song.title == "song 1"
+    if config.PREFETCH_NEXT_SONG:
+        assert started_at - finished_at < 0.05
+    else:
+        assert started_at - finished_at >= RESOLVE_LATENCY
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'prefetch': True}], indirect=True)
+async def test_skip_during_slow_prefetch_leaves_one_prefetched_source(controller) -> None:
+    sources = []
+    resolved = []
+
+    async def resolve(song, refresh=False):  # only the first resolve of song 1, by the prefetch, is slow
+        resolved.append(song.title)
+        await asyncio.sleep(RESOLVE_LATENCY if resolved.count("song 1") == 1 and song.title == "song 1" else 0)
+        return True
+
+    def create_audio_source(song):
+        sources.append(Fake_source(song))
+        return sources[-1]
+
+    controller.playlist_manager.resolve_song = resolve
+    controller.create_audio_source = create_audio_source
+
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    await asyncio.sleep(RESOLVE_LATENCY / 4)  # the prefetch of song 1 is still resolving
+    await controller.play_song(ctx, controller.playlist.next_song())
+    await controller.prefetch_task
+    await asyncio.sleep(RESOLVE_LATENCY)  # an earlier prefetch that is still running would finish now
+
+    live = [source.song.title for source in sources if not source.cleaned_up]
+    assert sorted(live) == ["song 0", "song 1", "song 2"]  # song 0 is cleaned up by the player thread
+    assert controller.prefetched[0].title == "song 2"
+    assert ctx.voice_client.started[-1][1].song.title == "song 1"
+
+
+@pytest.mark.asyncio
+async def test_stale_prefetched_source_is_cleaned_up(controller) -> None:
+    first, second = list(controller.playlist)[:2]
+    stale_source = Fake_source(second)
+    controller.prefetched = (second, stale_source)
+
+    assert controller.take_prefetched_source(first) is None
+    assert stale_source.cleaned_up
+    assert controller.prefetched is None
+
+
+@pytest.mark.asyncio
+async def test_forbidden_stream_is_resolved_again(controller) -> None:
+    refreshed = []
+
+    async def resolve(song, refresh=False):
+        if refresh:
+            refreshed.append(song.title)
+            song.url = "https://stream/fresh"
+        return True
+
+    controller.playlist_manager.resolve_song = resolve
+    controller.create_audio_source = lambda song: Fake_source(song, forbidden=song.url == "https://stream/expired")
+    controller.playlist.head.url = "https://stream/expired"
+
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    ctx.voice_client.finish()
+    while len(ctx.voice_client.started) < 2:
+        await asyncio.sleep(0.001)
+
+    assert refreshed == ["song 0"]
+    assert ctx.voice_client.started[1][1].song.title == "song 0"
+    assert controller.playlist.head.url == "https://stream/fresh"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'songs': 2, 'prefetch': True}], indirect=True)
+async def test_looped_song_is_replayed_from_memory(controller) -> None:
+    resolved, created = [], []
+
+    async def resolve(song, refresh=False):
+        resolved.append(song.title)
+        return True
+
+    def create_audio_source(song):
+        created.append(song.title)
+        return Frame_source(song)
+
+    controller.playlist_manager.resolve_song = resolve
+    controller.create_audio_source = create_audio_source
+    controller.is_loop = True
+
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    for _ in range(3):
+        source = ctx.voice_client.started[-1][1]
+        while source.read():
+            pass
+        source.cleanup()
+        if controller.prefetch_task is not None:
+            await controller.prefetch_task
+        started = len(ctx.voice_client.started)
+        ctx.voice_client.finish()
+        while len(ctx.voice_client.started) == started:
+            await asyncio.sleep(0.001)
+
+    assert created == ["song 0"] and resolved == ["song 0"]
+    assert all(isinstance(source, Cached_audio_source) for _, source in ctx.voice_client.started[1:])
+    controller.resetting()
+    assert controller.open_cached_source(Song(title="song 0", id="0")) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'songs': 1, 'prefetch': True}], indirect=True)
+async def test_looped_song_too_large_for_memory_is_prefetched(controller, monkeypatch) -> None:
+    monkeypatch.setattr(config, "READ_AHEAD_BUFFER", False)
+    monkeypatch.setattr(frame_cache, "max_track_bytes", 1000)
+    controller.create_audio_source = Frame_source
+    controller.is_loop = True
+
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    await controller.prefetch_task
+    assert controller.prefetched is None  # the repeat is expected to be played from memory
+
+    source = ctx.voice_client.started[-1][1]
+    while source.read():
+        pass
+    for _ in range(100):
+        if controller.prefetched is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert controller.prefetched[0] is controller.playlist.head
+    controller.resetting()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'songs': 1}], indirect=True)
+async def test_songs_are_not_recorded_without_loop(controller, monkeypatch) -> None:
+    recorded = []
+    monkeypatch.setattr(frame_cache, "record", lambda owner, song, source, on_drop=None: recorded.append(song.title) or source)
+
+    ctx = Fake_context()
+    await controller.play_song(ctx, controller.playlist.head)
+    assert recorded == []
+    controller.is_loop = True
+    await controller.play_song(ctx, controller.playlist.head)
+    assert recorded == ["song 0"]
+
+
+def test_parse_positions() -> None:
+    assert Audio_controller.parse_positions("3") == (3, 3)
+    assert Audio_controller.parse_positions("3..7") == (3, 7)
+    assert Audio_controller.parse_positions("7..3") is None
+    assert Audio_controller.parse_positions("0") is None
+    assert Audio_controller.parse_positions("a..b") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'songs': 5}], indirect=True)
+async def test_removing_current_song_plays_next(controller) -> None:
+    ctx = Fake_context()
+    ctx.voice_client.pause = lambda: None
+    await controller.play_song(ctx, controller.playlist.head)
+    assert await controller.remove(ctx, "1..2")
+    assert [song.title for song in controller.playlist] == ["song 2", "song 3", "song 4"]
+    assert ctx.voice_client.started[-1][1].song.title == "song 2"
+    assert not await controller.remove(ctx, "9")
+
+
+@pytest.mark.asyncio
+async def test_removing_last_song_while_it_plays_stops_playback(controller) -> None:
+    controller.playlist.jump(2)
+
+    ctx = Fake_context()
+    ctx.voice_client.pause = lambda: None
+    disconnected = []
+
+    async def disconnect():
+        disconnected.append(True)
+
+    ctx.voice_client.disconnect = disconnect
+    ctx.guild = ctx  # exit() disconnects through ctx.guild.voice_client
+    await controller.play_song(ctx, controller.playlist.head)
+    source = controller.audio_source
+    assert await controller.remove(ctx, "2..3")
+
+    assert source.cleaned_up and disconnected
+    assert controller.playlist is None
+    assert [source.song.title for _, source in ctx.voice_client.started] == ["song 2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("controller", [{'songs': 0}], indirect=True)
+async def test_playlist_view_renders_page_with_current_song(controller) -> None:
+    controller.playlist.extend(Song(title=f"{i} " + "x" * 95, duration=60) for i in range(1000))
+    controller.playlist.jump(500)
+
+    view = PlaylistView(controller)
+    content = view.render()
+    assert len(content) <= config.MESSAGE_MAX_LENGTH
+    assert "> 501. 500" in content
+    assert content.endswith(f"Page {500 // config.PLAYLIST_PAGE_SIZE + 1}/{-(-1000 // config.PLAYLIST_PAGE_SIZE)}")
+    assert "1. 0 " not in content
+
+    view.page = 0
+    assert "  1. 0 " in view.render()
+    assert view.prev_page_button.disabled and not view.next_page_button.disabled
+    view.page = 10 ** 6
+    assert "1000. 999" in view.render()
+    assert view.next_page_button.disabled
+
+
+def test_rendered_pages_are_cached_until_playlist_changes() -> None:
+    playlist = Playlist()
+    playlist.extend(Song(title=str(i), duration=60) for i in range(100))
+    page = playlist.print_page(0, 10)
+    assert playlist.print_page(0, 10) is page
+    playlist.next_song()
+    assert playlist.print_page(0, 10) is not page
+    assert "> 2. 1" in playlist.print_page(0, 10)
@@ -0,0 +1,153 @@
+import resource
+import shutil
+import subprocess
+import threading
+import time
+
+import discord
+import pytest
+
+from audio_source import PCM_SILENCE, Buffered_audio_source, Ffmpeg_opus_stream_source
+
+STREAM_SECONDS = 30
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+@pytest.fixture(scope="module")
+def opus_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("audio") / "stream.webm")
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={STREAM_SECONDS}",
+         "-ac", "2", "-ar", "48000", "-c:a", "libopus", "-b:a", "128k", path],
+        check=True
+    )
+    return path
+
+
+def cpu_seconds_per_minute(create_source) -> tuple:
+    """Plays a whole stream as fast as FFmpeg delivers it and returns the CPU time of FFmpeg and of the bot."""
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    process_before = time.process_time()
+    source = create_source()
+    frames = 0
+    while source.read():
+        frames += 1
+    source.cleanup()
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    ffmpeg = (children_after.ru_utime + children_after.ru_stime) - (children_before.ru_utime + children_before.ru_stime)
+    bot = time.process_time() - process_before
+    assert frames >= STREAM_SECONDS * 50 * 0.95
+    scale = 60 / STREAM_SECONDS
+    return ffmpeg * scale, bot * scale
+
+
+@requires_ffmpeg
+def test_opus_passthrough_uses_less_cpu(opus_file) -> None:
+    transcode = cpu_seconds_per_minute(lambda: Ffmpeg_opus_stream_source(opus_file, codec="vorbis"))
+    passthrough = cpu_seconds_per_minute(lambda: Ffmpeg_opus_stream_source(opus_file, codec="opus"))
+    assert sum(passthrough) < sum(transcode)
+    assert passthrough[0] < transcode[0] / 2
+
+
+@requires_ffmpeg
+def test_opus_source_keeps_error_output(tmp_path) -> None:
+    source = Ffmpeg_opus_stream_source(str(tmp_path / "missing.webm"), codec="opus")
+    while source.read():
+        pass
+    assert "No such file" in source.read_errors()
+    assert not source.is_forbidden()
+    source.cleanup()
+    assert source.read_errors() == ""
+
+
+def test_only_opus_is_passed_through() -> None:
+    assert Ffmpeg_opus_stream_source.can_pass_through("opus")
+    assert not Ffmpeg_opus_stream_source.can_pass_through("mp4a.40.2")
+    assert not Ffmpeg_opus_stream_source.can_pass_through(None)
+
+
+class Stalling_source(discord.AudioSource):
+    """Returns numbered frames, stalls after `stall_after` frames until resumed and ends after `length` frames."""
+
+    def __init__(self, length, stall_after=None):
+        self.length = length
+        self.stall_after = stall_after
+        self.resumed = threading.Event()
+        self.position = 0
+        self.cleaned_up = False
+
+    def read(self):
+        if self.position == self.stall_after:
+            self.resumed.wait()
+        if self.position >= self.length or self.cleaned_up:
+            return b""
+        self.position += 1
+        return self.position.to_bytes(4, "big")
+
+    def is_forbidden(self):
+        return False
+
+    def cleanup(self):
+        self.cleaned_up = True
+        self.resumed.set()
+
+
+def test_buffered_source_stays_bounded() -> None:
+    source = Stalling_source(1000)
+    buffered = Buffered_audio_source(source, buffer_seconds=0.2, preroll_seconds=0.1)
+    time.sleep(0.1)
+    assert buffered.fill() == buffered.capacity == 10
+    assert buffered.fill_seconds() == pytest.approx(0.2)
+    frames = []
+    while frame := buffered.read():
+        if frame != PCM_SILENCE:  # this reader is faster than real time and can drain the buffer
+            frames.append(int.from_bytes(frame, "big"))
+    assert frames == list(range(1, 1001))
+    assert not buffered.is_forbidden()
+    buffered.cleanup()
+    assert source.cleaned_up
+
+
+def test_buffered_source_plays_silence_on_underrun() -> None:
+    source = Stalling_source(40, stall_after=20)
+    buffered = Buffered_audio_source(source, buffer_seconds=1, preroll_seconds=0.1)
+    assert buffered.read() == (1).to_bytes(4, "big")
+    for _ in range(19):
+        assert buffered.read() != PCM_SILENCE
+    assert buffered.read() == PCM_SILENCE
+    assert buffered.read() == PCM_SILENCE
+    assert buffered.underruns == 1
+
+    source.resumed.set()
+    while buffered.fill() < buffered.preroll:
+        time.sleep(0.001)
+    assert buffered.read() == (21).to_bytes(4, "big")
+    rest = []
+    while frame := buffered.read():
+        rest.append(frame)
+    assert len(rest) == 19 and PCM_SILENCE not in rest
+    assert buffered.underruns == 1
+    buffered.cleanup()
+
+
+def test_first_read_waits_for_preroll() -> None:
+    source = Stalling_source(100, stall_after=3)
+    buffered = Buffered_audio_source(source, preroll_seconds=0.2, preroll_timeout=0.05)
+    start = time.perf_counter()
+    assert buffered.read() == (1).to_bytes(4, "big")
+    assert time.perf_counter() - start >= 0.05
+    buffered.cleanup()
+
+
+def test_cleanup_does_not_wait_for_a_stalled_reader() -> None:
+    source = Stalling_source(100, stall_after=3)
+    source.cleanup = lambda: None  # the stalled read isn't interrupted by the cleanup
+    buffered = Buffered_audio_source(source, preroll_seconds=0.02)
+    assert buffered.read() == (1).to_bytes(4, "big")
+    start = time.perf_counter()
+    buffered.cleanup()
+    assert time.perf_counter() - start < 0.1
+    source.resumed.set()
+    buffered.reader.join(1)
+    assert not buffered.reader.is_alive()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bot import Startup_timer, get_command_tree_hash, sync_command_tree
+
+
+class Fake_command:
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+
+    def to_dict(self):
+        return {'name': self.name, 'description': self.description}
+
+
+class Fake_tree:
+
+    def __init__(self, *commands):
+        self.commands = list(commands)
+        self.syncs = 0
+
+    def get_commands(self):
+        return self.commands
+
+    async def sync(self):
+        self.syncs += 1
+        return self.commands
+
+
+def test_yt_dlp_is_not_imported_at_startup() -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, bot, downloader; sys.exit('yt_dlp' in sys.modules)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert result.returncode == 0
+
+
+def test_command_tree_hash() -> None:
+    first = Fake_tree(Fake_command("play", "Play music"), Fake_command("skip", "Skip"))
+    reordered = Fake_tree(Fake_command("skip", "Skip"), Fake_command("play", "Play music"))
+    changed = Fake_tree(Fake_command("play", "Play music in a voice channel"), Fake_command("skip", "Skip"))
+    assert get_command_tree_hash(first) == get_command_tree_hash(reordered)
+    assert get_command_tree_hash(first) != get_command_tree_hash(changed)
+
+
+@pytest.mark.asyncio
+async def test_sync_is_skipped_for_unchanged_commands(tmp_path) -> None:
+    hash_path = str(tmp_path / "tree_hash")
+    tree = Fake_tree(Fake_command("play", "Play music"))
+    assert await sync_command_tree(tree, hash_path)
+    assert not await sync_command_tree(tree, hash_path)
+    assert tree.syncs == 1
+
+    tree.commands.append(Fake_command("skip", "Skip"))
+    assert await sync_command_tree(tree, hash_path)
+    assert tree.syncs == 2
+
+
+def test_startup_report() -> None:
+    timer = Startup_timer(0)
+    with timer.measure("load cogs"):
+        pass
+    timer.start("connect")
+    timer.stop("connect")
+    timer.stop("never started")
+    report = timer.report()
+    assert [stage for stage, _ in timer.stages] == ["load cogs", "connect"]
+    assert "load cogs" in report and "connect" in report
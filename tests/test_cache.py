@@ -0,0 +1,76 @@
+import sys
+
+from cache import Lru_cache, estimate_size
+from playlist_manager import Playlist_manager
+
+
+class Fake_clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = Lru_cache(max_entries=2, max_bytes=1 << 20, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = Fake_clock()
+    cache = Lru_cache(max_entries=10, max_bytes=1 << 20, ttl=60, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2, ttl=10)
+    clock.now = 30
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    clock.now = 61
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations'], stats['entries']) == (1, 2, 2, 0)
+
+
+def test_memory_cap() -> None:
+    cache = Lru_cache(max_entries=100, max_bytes=1000, ttl=60, sizeof=lambda value: 300)
+    for key in range(5):
+        cache.put(key, key)
+    assert len(cache) == 3
+    assert cache.size == 900
+    assert cache.get(0) is None
+    assert cache.get(4) == 4
+
+
+def test_peek_and_resize() -> None:
+    cache = Lru_cache(max_entries=100, max_bytes=1000, ttl=60, sizeof=lambda value: 300)
+    for key in range(3):
+        cache.put(key, key)
+    assert cache.peek(0) == 0 and cache.peek(9) is None
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+    cache.resize(600)
+    assert cache.get(0) is None  # peek didn't make it recently used
+    assert cache.get(1) == 1 and cache.get(2) == 2
+    assert cache.size == 600
+
+
+def test_size_estimate_includes_nested_formats() -> None:
+    formats = [{'format_id': str(i), 'acodec': "opus", 'abr': 128.0, 'filesize': 3500000, 'url': "https://stream/" + "x" * 1000}
+               for i in range(5)]
+    song_info = {'title': "song", 'url': formats[0]['url'], 'duration': 212, 'formats': formats}
+    urls = sum(sys.getsizeof(audio_format['url']) for audio_format in formats)
+    assert estimate_size(song_info) > urls + sys.getsizeof(song_info['url'])
+    assert estimate_size((b"x" * 100,)) > 100
+
+
+def test_get_cache_key() -> None:
+    assert Playlist_manager.get_cache_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley") == "dQw4w9WgXcQ"
+    assert Playlist_manager.get_cache_key("http://youtu.be/SA2iWivDJiE") == "SA2iWivDJiE"
+    assert Playlist_manager.get_cache_key("not a url") is None
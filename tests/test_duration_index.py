@@ -0,0 +1,34 @@
+import random
+
+from duration_index import Duration_index, format_duration
+
+
+def test_prefix_sums_follow_appends_and_updates() -> None:
+    rng = random.Random(7)
+    index = Duration_index()
+    values = []
+    for _ in range(500):
+        if values and rng.random() < 0.3:
+            position = rng.randrange(len(values))
+            values[position] = rng.randrange(600)
+            index.update(position, values[position])
+        else:
+            values.append(rng.choice([None, rng.randrange(600)]))
+            index.append(values[-1])
+        position = rng.randrange(len(values) + 1)
+        assert index.prefix(position) == sum(value or 0 for value in values[:position])
+    assert index.total() == sum(value or 0 for value in values)
+
+
+def test_rebuild() -> None:
+    index = Duration_index([1, 2, 3])
+    index.rebuild([10, None, 30, 40, 50])
+    assert [index.prefix(i) for i in range(6)] == [0, 10, 10, 40, 80, 130]
+    index.append(6)
+    assert index.total() == 136
+
+
+def test_format_duration() -> None:
+    assert format_duration(0) == "00:00"
+    assert format_duration(75) == "01:15"
+    assert format_duration(3725) == "1:02:05"
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from extractor_pool import Extractor_pool
+
+
+class Fake_extractor:
+    """Fails if two threads use the same instance at once."""
+
+    def __init__(self, options):
+        self.options = options
+        self.busy = threading.Lock()
+
+    def extract_info(self, url, download=False, process=True):
+        assert self.busy.acquire(blocking=False), "extractor used by two threads at once"
+        try:
+            time.sleep(0.001)
+            if url == "playlist":
+                return {'entries': ({'id': str(i)} for i in range(3))}
+            return {'id': url}
+        finally:
+            self.busy.release()
+
+
+def test_instances_are_reused() -> None:
+    pool = Extractor_pool({'quiet': True}, size=2, factory=Fake_extractor)
+    pool.warm()
+    assert pool.created == 2
+    for i in range(10):
+        assert pool.extract_info(str(i)) == {'id': str(i)}
+    assert pool.created == 2
+    assert pool.reused == 10
+    assert pool.acquire().options == {'quiet': True}
+
+
+def test_concurrent_checkouts_never_share_an_instance() -> None:
+    pool = Extractor_pool({}, size=4, factory=Fake_extractor)
+    errors = []
+
+    def work():
+        try:
+            for i in range(50):
+                pool.extract_info(str(i))
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert pool.idle.qsize() <= 4
+
+
+def test_lazy_entries_keep_the_instance_checked_out() -> None:
+    pool = Extractor_pool({}, size=1, factory=Fake_extractor)
+    pool.warm()
+    info = pool.extract_info("playlist", process=False)
+    assert pool.idle.qsize() == 0
+    assert [entry['id'] for entry in info['entries']] == ["0", "1", "2"]
+    assert pool.idle.qsize() == 1
+
+    with pool.checkout() as extractor:
+        assert pool.idle.qsize() == 0
+    assert pool.acquire() is extractor
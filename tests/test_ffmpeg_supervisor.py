@@ -0,0 +1,94 @@
+import asyncio
+import os
+import stat
+import time
+
+import pytest
+
+from audio_source import Ffmpeg_stream_source
+from ffmpeg_supervisor import Ffmpeg_supervisor
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """Writes a fake ffmpeg that ignores its arguments and runs for the given number of seconds."""
+    def create(seconds: float) -> str:
+        path = tmp_path / f"ffmpeg-{seconds}"
+        path.write_text(f"#!/bin/sh\nexec sleep {seconds}\n")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        return str(path)
+    return create
+
+
+@pytest.mark.asyncio
+async def test_processes_are_capped_and_started_in_order(fake_ffmpeg) -> None:
+    supervisor = Ffmpeg_supervisor(max_processes=2)
+    executable = fake_ffmpeg(30)
+    started = []
+
+    async def start(name):
+        source = await supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=executable))
+        started.append((name, source))
+
+    tasks = [asyncio.ensure_future(start(name)) for name in ("a", "b", "c", "d")]
+    await asyncio.sleep(0.1)
+    assert [name for name, _ in started] == ["a", "b"]
+    assert supervisor.stats()['waiting'] == 2
+    assert await supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=executable), wait=False) is None
+
+    started[0][1].cleanup()
+    await asyncio.sleep(0.1)
+    assert [name for name, _ in started] == ["a", "b", "c"]
+    started[1][1].cleanup()
+    await asyncio.gather(*tasks)
+    assert [name for name, _ in started] == ["a", "b", "c", "d"]
+    assert len(supervisor) == 2 and supervisor.peak == 2 and supervisor.started == 4
+
+    for _, source in started[2:]:
+        source.cleanup()
+    assert len(supervisor) == 0 and supervisor.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_exited_processes_are_reaped(fake_ffmpeg) -> None:
+    supervisor = Ffmpeg_supervisor(max_processes=1)
+    source = await supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=fake_ffmpeg(0)))
+    process = source._process
+    deadline = time.monotonic() + 5
+    while supervisor.reap() == 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert process.returncode == 0
+    assert supervisor.stats()['running'] == 0 and supervisor.in_use == 0
+
+    other = await asyncio.wait_for(supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=fake_ffmpeg(30))), 1)
+    source.cleanup()  # the slot was already returned by the reaping
+    assert supervisor.in_use == 1
+    other.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_gives_up_its_place(fake_ffmpeg) -> None:
+    supervisor = Ffmpeg_supervisor(max_processes=1)
+    executable = fake_ffmpeg(30)
+    source = await supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=executable))
+    waiting = asyncio.ensure_future(supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=executable)))
+    await asyncio.sleep(0.05)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    source.cleanup()
+    assert supervisor.in_use == 0 and not supervisor.waiters
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+async def test_stats_report_usage_and_latency(fake_ffmpeg) -> None:
+    supervisor = Ffmpeg_supervisor(max_processes=4)
+    source = await supervisor.start(lambda: Ffmpeg_stream_source("stream", executable=fake_ffmpeg(30)))
+    stats = supervisor.stats()
+    process = stats['processes'][0]
+    assert stats['running'] == 1 and process['pid'] == source._process.pid
+    assert process['rss'] > 0 and process['cpu'] >= 0
+    assert process['queued_for'] >= 0 and process['spawn_latency'] > 0
+    source.cleanup()
+    assert supervisor.stats()['processes'] == []
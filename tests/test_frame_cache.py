@@ -0,0 +1,134 @@
+import discord
+
+from frame_cache import Cached_audio_source, Frame_cache
+from song import Song
+
+
+class Frame_source(discord.AudioSource):
+
+    def __init__(self, count, size=100, forbidden=False):
+        self.frames = [bytes([i % 256]) * size for i in range(count)]
+        self.forbidden = forbidden
+        self.cleaned_up = False
+
+    def read(self):
+        return self.frames.pop(0) if self.frames else b""
+
+    def is_opus(self):
+        return True
+
+    def is_forbidden(self):
+        return self.forbidden
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+def play(source) -> list:
+    frames = []
+    while frame := source.read():
+        frames.append(frame)
+    source.cleanup()
+    return frames
+
+
+def test_played_track_is_replayed_from_memory() -> None:
+    cache = Frame_cache(max_track_bytes=1024 * 1024, max_bytes=4 * 1024 * 1024, ttl=60)
+    song = Song(title="song", duration=2, id="dQw4w9WgXcQ")
+    owner = object()
+    recorder = cache.record(owner, song, Frame_source(100))
+    assert cache.will_cache(owner, song)
+    frames = play(recorder)
+    assert recorder.source.cleaned_up and not cache.recordings
+
+    replay = cache.open(owner, song)
+    assert isinstance(replay, Cached_audio_source) and replay.is_opus()
+    assert play(replay) == frames and len(frames) == 100
+    assert play(cache.open(owner, song)) == frames
+    assert cache.open(owner, Song(title="other", id="SA2iWivDJiE")) is None
+    assert cache.open(object(), song) is None
+    assert cache.stats()['replays'] == 2
+
+    cache.discard(owner)
+    assert cache.open(owner, song) is None
+
+
+def test_tracks_that_are_not_whole_are_not_cached() -> None:
+    cache = Frame_cache(max_track_bytes=5000, max_bytes=4 * 1024 * 1024, ttl=60)
+    owner = object()
+    dropped = []
+    too_long = Song(title="too long", id="a")
+    play(cache.record(owner, too_long, Frame_source(100), on_drop=lambda: dropped.append(too_long.title)))
+    cut_short = Song(title="cut short", duration=10, id="b")
+    play(cache.record(owner, cut_short, Frame_source(20), on_drop=lambda: dropped.append(cut_short.title)))
+    forbidden = Song(title="forbidden", id="c")
+    play(cache.record(owner, forbidden, Frame_source(10, forbidden=True), on_drop=lambda: dropped.append(forbidden.title)))
+    skipped = Song(title="skipped", id="d")
+    recorder = cache.record(owner, skipped, Frame_source(10), on_drop=lambda: dropped.append(skipped.title))
+    recorder.read()
+    recorder.cleanup()
+    assert not cache.will_cache(owner, skipped)
+    assert dropped == ["too long"]  # only a recording over the budget asks for another way to play the repeat
+
+    for song in (too_long, cut_short, forbidden, skipped):
+        assert cache.open(owner, song) is None
+    assert cache.stats()['entries'] == 0 and not cache.recordings
+
+
+def test_global_budget_evicts_least_recently_used_guild() -> None:
+    cache = Frame_cache(max_track_bytes=20000, max_bytes=30000, ttl=60)
+    owners = [object() for _ in range(3)]
+    songs = [Song(title=str(i), id=str(i)) for i in range(3)]
+    for owner, song in zip(owners[:2], songs):
+        play(cache.record(owner, song, Frame_source(100)))
+    assert cache.open(owners[0], songs[0]) is not None
+    play(cache.record(owners[2], songs[2], Frame_source(100)))
+
+    assert cache.open(owners[1], songs[1]) is None
+    assert cache.open(owners[0], songs[0]) is not None
+    assert cache.open(owners[2], songs[2]) is not None
+    assert cache.tracks.size <= 30000
+
+
+def test_recording_discarded_with_its_player_is_not_stored() -> None:
+    cache = Frame_cache(max_track_bytes=1024 * 1024, max_bytes=4 * 1024 * 1024, ttl=60)
+    owner, song = object(), Song(title="song", id="a")
+    recorder = cache.record(owner, song, Frame_source(10))
+    recorder.read()
+    cache.discard(owner)
+    play(recorder)
+    assert cache.open(owner, song) is None
+
+
+def test_running_recordings_count_against_the_global_budget() -> None:
+    cache = Frame_cache(max_track_bytes=20000, max_bytes=20000, ttl=60)
+    owner, song = object(), Song(title="cached", id="a")
+    play(cache.record(owner, song, Frame_source(50)))
+    assert cache.tracks.size == 6650
+
+    recorders = [cache.record(object(), Song(title=str(i), id=str(i)), Frame_source(100)) for i in range(2)]
+    for _ in range(100):
+        for recorder in recorders:
+            recorder.read()
+            assert cache.tracks.size + cache.recording_bytes <= 20000
+    assert cache.open(owner, song) is None  # evicted to make room for the recordings
+    kept = [recorder for recorder in recorders if recorder.is_recording]
+    assert len(kept) == 1  # the other one was dropped when both no longer fit
+
+    for recorder in recorders:
+        play(recorder)
+    assert cache.recording_bytes == 0
+    assert [cache.open(recorder.owner, recorder.song) is not None for recorder in recorders] == \
+        [recorder is kept[0] for recorder in recorders]
+
+
+def test_discarded_recording_releases_its_memory() -> None:
+    cache = Frame_cache(max_track_bytes=20000, max_bytes=20000, ttl=60)
+    owner = object()
+    recorder = cache.record(owner, Song(title="song", id="a"), Frame_source(10))
+    recorder.read()
+    assert cache.recording_bytes > 0
+    cache.discard(owner)
+    assert cache.recording_bytes == 0
+    play(recorder)
+    assert cache.recording_bytes == 0 and cache.stats()['entries'] == 0
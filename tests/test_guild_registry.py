@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from audio_controller import Audio_controller
+from guild_registry import Guild_registry
+from playlist import Playlist
+
+
+class Fake_clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Fake_controller:
+
+    def __init__(self, guild):
+        self.guild = guild
+        self.playing = False
+
+    def is_idle(self):
+        return not self.playing
+
+
+def test_controllers_are_created_on_first_use() -> None:
+    created = []
+    registry = Guild_registry(lambda guild: created.append(guild) or Fake_controller(guild))
+    assert registry.peek("a") is None
+    assert len(registry) == 0
+
+    controller = registry.get("a")
+    assert registry["a"] is controller
+    assert registry.peek("a") is controller
+    assert created == ["a"]
+
+
+def test_lookup_without_factory_fails_clearly() -> None:
+    registry = Guild_registry()
+    with pytest.raises(RuntimeError, match="no factory"):
+        registry.get("a")
+    assert len(registry) == 0
+
+
+def test_idle_controllers_are_evicted() -> None:
+    clock = Fake_clock()
+    registry = Guild_registry(Fake_controller, idle_timeout=100, sweep_interval=10, clock=clock)
+    registry.get("idle")
+    registry.get("playing").playing = True
+    registry.get("recent")
+
+    clock.now = 95
+    registry.get("recent")
+    clock.now = 150
+    registry.get("new")
+    assert "idle" not in registry
+    assert "playing" in registry
+    assert "recent" in registry
+
+    clock.now = 155
+    registry.get("new")
+    clock.now = 300
+    assert registry.evict_idle() == 2
+    assert list(registry.controllers) == ["playing"]
+
+
+@pytest.mark.asyncio
+async def test_controller_builds_session_objects_lazily() -> None:
+    controller = Audio_controller(type("Fake_bot", (), {"loop": asyncio.get_running_loop()})())
+    assert controller._playlist_manager is None and controller._view is None
+    assert controller.is_idle()
+
+    manager = controller.playlist_manager
+    assert controller.playlist_manager is manager
+    assert controller.view is controller.view
+    controller.resetting()
+    assert controller._playlist_manager is None and controller._view is None
+    assert manager.time_to_shutdown
+
+
+@pytest.mark.asyncio
+async def test_controller_left_with_empty_playlist_is_evicted() -> None:
+    clock = Fake_clock()
+    registry = Guild_registry(lambda guild: Audio_controller(type("Fake_bot", (), {"loop": asyncio.get_running_loop()})()),
+                              idle_timeout=100, sweep_interval=10, clock=clock)
+    registry.get("guild").playlist = Playlist()  # what the play command leaves behind when the first song can't be added
+    clock.now = 200
+    assert registry.evict_idle() == 1
+    assert "guild" not in registry
@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from metadata_store import Metadata_store
+
+song_info = {'title': "Never Gonna Give You Up", 'url': None, 'duration': 212, 'id': "dQw4w9WgXcQ", 'webpage_url': "https://www.youtube.com/watch?v=dQw4w9WgXcQ", 'expire': None, 'acodec': None}
+
+
+def test_store_survives_reopening(tmp_path) -> None:
+    path = str(tmp_path / "metadata.sqlite3")
+    expire = int(time.time()) + 6 * 60 * 60
+    store = Metadata_store(path)
+    store.put("dQw4w9WgXcQ", dict(song_info, url=f"https://stream/?expire={expire}", expire=expire, acodec="opus"), expire)
+    store.close()
+
+    store = Metadata_store(path)
+    assert store.get("dQw4w9WgXcQ") == dict(song_info, url=f"https://stream/?expire={expire}", expire=expire, acodec="opus")
+    assert store.get("SA2iWivDJiE") is None
+    assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_expired_stream_url_is_not_returned(tmp_path) -> None:
+    store = Metadata_store(str(tmp_path / "metadata.sqlite3"), expiry_margin=600)
+    expire = int(time.time()) + 300
+    store.put("dQw4w9WgXcQ", dict(song_info, url="https://stream/"), expire)
+    assert store.get("dQw4w9WgXcQ") == song_info
+    store.put("dQw4w9WgXcQ", dict(song_info, url="https://stream/"), None)
+    assert store.get("dQw4w9WgXcQ") == song_info
+    store.close()
+
+
+def test_codec_column_is_added_to_old_databases(tmp_path) -> None:
+    path = str(tmp_path / "metadata.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE songs (id TEXT PRIMARY KEY, title TEXT, duration INTEGER, webpage_url TEXT, url TEXT, expire INTEGER)"
+    )
+    connection.execute("INSERT INTO songs (id, title) VALUES ('dQw4w9WgXcQ', 'Never Gonna Give You Up')")
+    connection.commit()
+    connection.close()
+
+    store = Metadata_store(path)
+    assert store.get("dQw4w9WgXcQ")['acodec'] is None
+    store.close()
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from player_renderer import Player_renderer
+
+
+class Recording_channel:
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def call(self, name, content=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.005)
+        self.in_flight -= 1
+        self.calls.append((name, content))
+
+    async def send(self, content, view=None):
+        await self.call("send", content)
+        return Recording_message(self)
+
+
+class Recording_message:
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def edit(self, content=None, view=None):
+        await self.channel.call("edit", content)
+
+    async def delete(self):
+        await self.channel.call("delete")
+
+
+async def wait_for_flush(renderer):
+    while renderer.task is not None and not renderer.task.done():
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_state_changes_are_merged_into_one_edit() -> None:
+    channel = Recording_channel()
+    renderer = Player_renderer(edit_delay=0.02, repost_interval=1)
+    await renderer.send(channel, "Now playing: a")
+    for i in range(20):
+        renderer.request_edit(f"Now playing: {i}")
+        renderer.request_edit()
+    await wait_for_flush(renderer)
+
+    assert channel.calls == [("send", "Now playing: a"), ("edit", "Now playing: 19")]
+    assert renderer.stats() == {'api_calls': 2, 'requested_calls': 41, 'saved_calls': 39}
+
+
+@pytest.mark.asyncio
+async def test_reposts_are_throttled() -> None:
+    channel = Recording_channel()
+    renderer = Player_renderer(edit_delay=0.01, repost_interval=0.2)
+    await renderer.send(channel, "player")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    while loop.time() - started < 0.5:
+        renderer.request_repost(channel)
+        renderer.request_edit()
+        await asyncio.sleep(0.01)
+    await wait_for_flush(renderer)
+
+    reposts = [call for call in channel.calls if call[0] == "send"]
+    assert 2 <= len(reposts) <= 5
+    assert not any(name == "edit" for name, _ in channel.calls)
+    assert channel.max_in_flight == 1
+    assert renderer.stats()['saved_calls'] > 50
+
+
+@pytest.mark.asyncio
+async def test_reset_cancels_pending_updates() -> None:
+    channel = Recording_channel()
+    renderer = Player_renderer(edit_delay=0.01, repost_interval=1)
+    renderer.request_edit("ignored without a message")
+    assert renderer.task is None
+
+    await renderer.send(channel, "player")
+    renderer.request_edit("changed")
+    renderer.reset()
+    await asyncio.sleep(0.03)
+    assert channel.calls == [("send", "player")]
+    assert renderer.message is None
@@ -0,0 +1,189 @@
+import random
+import threading
+import time
+
+from playlist import Playlist
+from song import Song
+
+
+def make_playlist(size: int) -> Playlist:
+    playlist = Playlist()
+    for i in range(size):
+        playlist.append_song(Song(title=str(i)))
+    return playlist
+
+
+def titles(playlist: Playlist) -> list:
+    return [song.title for song in playlist]
+
+
+def test_cursor_keeps_start_of_queue() -> None:
+    playlist = make_playlist(3)
+    assert playlist.head.title == "0"
+    assert playlist.next_song().title == "1"
+    assert playlist.next_song().title == "2"
+    assert playlist.next_song() is None
+    assert playlist.head.title == "2"
+    assert titles(playlist) == ["0", "1", "2"]
+    assert playlist.previous_song().title == "1"
+    assert playlist.previous_song().title == "0"
+    assert playlist.previous_song() is None
+    assert (playlist.size, playlist[1].title, playlist.tail.title) == (3, "1", "2")
+
+
+def test_empty_playlist() -> None:
+    playlist = Playlist()
+    assert playlist.head is None
+    assert playlist.next_song() is None
+    assert playlist.previous_song() is None
+    assert playlist.peek_next_song() is None
+
+
+def test_insert_remove_and_move_keep_current_song() -> None:
+    playlist = make_playlist(5)
+    playlist.next_song()
+    playlist.next_song()
+    assert playlist.head.title == "2"
+
+    playlist.insert_song(0, Song(title="new"))
+    assert playlist.head.title == "2"
+    playlist.remove_song(0)
+    assert playlist.head.title == "2"
+    playlist.move_song(4, 0)
+    assert titles(playlist) == ["4", "0", "1", "2", "3"]
+    assert playlist.head.title == "2"
+    playlist.move_song(3, 4)
+    assert playlist.head.title == "2"
+    assert playlist.peek_next_song() is None
+
+    playlist.remove_song(4)
+    assert playlist.head.title == "3"
+    assert "\n> 4. 3\n" in playlist.print_playlist()
+
+
+def test_extend_appends_batch() -> None:
+    playlist = make_playlist(1)
+    version = playlist.version
+    playlist.extend(Song(title=str(i)) for i in range(1, 4))
+    playlist.extend([])
+    assert titles(playlist) == ["0", "1", "2", "3"]
+    assert playlist.version == version + 1
+    assert playlist.snapshot() == (list(playlist), 0)
+
+
+def test_concurrent_extend_and_navigation() -> None:
+    writers, batches, batch_size = 4, 200, 25
+    playlist = Playlist()
+    errors = []
+    done = threading.Event()
+
+    def write(writer):
+        for batch in range(batches):
+            playlist.extend(Song(title=f"{writer}:{batch}:{i}") for i in range(batch_size))
+
+    def navigate():
+        while not done.is_set():
+            if playlist.next_song() is None:
+                playlist.previous_song()
+
+    def read():
+        while not done.is_set():
+            songs, cursor = playlist.snapshot()
+            if songs and not 0 <= cursor < len(songs):
+                errors.append(f"cursor {cursor} outside of {len(songs)} songs")
+            if len(songs) % batch_size:
+                errors.append(f"partial batch in a snapshot of {len(songs)} songs")
+            playlist.print_playlist()
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    helpers = [threading.Thread(target=navigate), threading.Thread(target=read), threading.Thread(target=read)]
+    for thread in helpers + threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    for thread in helpers:
+        thread.join()
+
+    assert not errors
+    assert playlist.size == writers * batches * batch_size
+    for writer in range(writers):
+        own = [song.title for song in playlist if song.title.startswith(f"{writer}:")]
+        assert own == [f"{writer}:{batch}:{i}" for batch in range(batches) for i in range(batch_size)]
+
+
+def test_shuffle_keeps_current_song() -> None:
+    playlist = make_playlist(50)
+    playlist.jump(10)
+    playlist.shuffle(random.Random(1))
+    assert titles(playlist)[:11] == [str(i) for i in range(11)]
+    assert playlist.head.title == "10"
+    assert sorted(titles(playlist), key=int) == [str(i) for i in range(50)]
+    assert titles(playlist)[11:] != [str(i) for i in range(11, 50)]
+
+
+def test_remove_range() -> None:
+    playlist = make_playlist(10)
+    playlist.jump(8)
+    assert [song.title for song in playlist.remove_range(2, 5)] == ["2", "3", "4"]
+    assert playlist.head.title == "8"
+
+    playlist.jump(1)
+    playlist.remove_range(1, 3)
+    assert titles(playlist) == ["0", "6", "7", "8", "9"]
+    assert playlist.head.title == "6"
+
+    playlist.jump(4)
+    playlist.remove_range(3, 100)
+    assert titles(playlist) == ["0", "6", "7"]
+    assert playlist.head.title == "7"
+    assert playlist.remove_range(5, 8) == []
+
+
+def test_jump() -> None:
+    playlist = make_playlist(3)
+    assert playlist.jump(2).title == "2"
+    assert playlist.jump(3) is None
+    assert playlist.head.title == "2"
+
+
+def test_queue_operations_on_large_queue() -> None:
+    size = 50000
+    playlist = make_playlist(size)
+    playlist.jump(size // 2)
+    current = playlist.head
+    start = time.perf_counter()
+    for i in range(1000):
+        playlist.move_song(i * 37 % size, i * 53 % size)
+        playlist.jump(playlist.cursor)
+    playlist.remove_range(100, 1100)
+    playlist.shuffle()
+    elapsed = time.perf_counter() - start
+    assert playlist.head is current
+    assert playlist.size == size - 1000
+    assert elapsed < 1
+
+
+def test_remaining_time_and_starts_in() -> None:
+    playlist = Playlist()
+    playlist.extend(Song(title=str(i), duration=(i + 1) * 60) for i in range(5))
+    playlist.append_song(Song(title="unknown"))
+    assert playlist.remaining_time() == 15 * 60
+    assert playlist.starts_in(3) == 6 * 60
+
+    playlist.next_song()
+    assert playlist.remaining_time() == 14 * 60
+    assert playlist.starts_in(0) is None
+    assert playlist.starts_in(2) == 2 * 60
+
+    playlist.move_song(4, 2)
+    assert playlist.starts_in(3) == 7 * 60
+    playlist.remove_range(2, 3)
+    assert playlist.remaining_time() == 9 * 60
+
+    song = playlist.peek_next_song()
+    song.duration += 60
+    playlist.update_song_duration(song)
+    assert playlist.remaining_time() == 10 * 60
+    assert "10:00 left" in playlist.print_playlist()
+    assert "4. 3 (in 06:00)" in playlist.print_playlist()
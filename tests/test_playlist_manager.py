@@ -0,0 +1,184 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+import playlist_manager
+from cache import song_cache
+from metadata_store import Metadata_store
+from playlist import Playlist
+from playlist_manager import Playlist_manager
+from song import Song
+
+
+class Fake_extractor:
+
+    def extract_info(self, url, download=False, process=True):
+        time.sleep(random.uniform(0, 0.01))
+        return {'title': url, 'url': f"https://stream/{url}", 'duration': 60}
+
+
+class Fake_downloader:
+
+    def __init__(self):
+        self.downloader = Fake_extractor()
+
+
+class Counting_extractor(Fake_extractor):
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_info(self, url, download=False, process=True):
+        self.calls += 1
+        return super().extract_info(url, download, process)
+
+
+class Unavailable_extractor(Counting_extractor):
+
+    def extract_info(self, url, download=False, process=True):
+        if "unavailable" in url:
+            self.calls += 1
+            return None  # what yt-dlp returns for unavailable videos with ignoreerrors
+        return super().extract_info(url, download, process)
+
+
+class Formats_extractor:
+
+    def extract_info(self, url, download=False, process=True):
+        return {'title': url, 'id': "dQw4w9WgXcQ", 'url': "https://stream/251?expire=2000000000", 'acodec': "opus", 'duration': 200,
+                'formats': [
+                    {'format_id': "250", 'vcodec': "none", 'acodec': "opus", 'abr': 70, 'url': "https://stream/250?expire=2000000000"},
+                    {'format_id': "251", 'vcodec': "none", 'acodec': "opus", 'abr': 135, 'url': "https://stream/251?expire=2000000000"},
+                ]}
+
+
+@pytest.fixture
+def manager(request):
+    """A playlist manager with an empty song cache, parameterize it indirectly with the extractor class to be used."""
+    song_cache.clear()
+    manager = Playlist_manager()
+    manager.downloader = Fake_downloader()
+    manager.downloader.downloader = getattr(request, "param", Counting_extractor)()
+    yield manager
+    song_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_playlist_expansion_keeps_order(manager) -> None:
+    manager.expansion_concurrency = 6
+    playlist = Playlist()
+    playlist_info = {'entries': ({'url': str(i)} for i in range(40))}
+
+    await manager._add_other_playlist(playlist_info, playlist, limit=30)
+
+    titles = [song.title for song in playlist]
+    assert titles == [str(i) for i in range(30)]
+
+
+@pytest.mark.asyncio
+async def test_songs_are_queued_before_the_next_page_is_fetched(manager) -> None:
+    playlist = Playlist()
+    next_page = threading.Event()
+
+    def entries():
+        for i in range(20):
+            if i == 10:
+                next_page.wait(5)
+            yield {'id': f"id{i:09}", 'url': f"https://www.youtube.com/watch?v=id{i:09}", 'title': f"title {i}"}
+
+    task = asyncio.ensure_future(manager._add_other_playlist({'entries': entries()}, playlist))
+    for _ in range(100):
+        if playlist.size:
+            break
+        await asyncio.sleep(0.01)
+    assert 0 < playlist.size <= 10 and not task.done()
+
+    next_page.set()
+    await task
+    assert playlist.size == 20
+
+
+@pytest.mark.asyncio
+async def test_flat_entries_are_queued_without_extraction(manager) -> None:
+    playlist = Playlist()
+    entries = [{'id': f"id{i:09}", 'url': f"https://www.youtube.com/watch?v=id{i:09}", 'title': f"title {i}", 'duration': 60} for i in range(100)]
+
+    await manager._add_other_playlist({'entries': iter(entries)}, playlist)
+
+    assert playlist.size == 100
+    assert manager.downloader.downloader.calls == 0
+    assert playlist.head.is_flat
+
+    assert await manager.resolve_song(playlist.head)
+    assert manager.downloader.downloader.calls == 1
+    assert playlist.head.url == "https://stream/https://www.youtube.com/watch?v=id000000000"
+    assert playlist.head.title == "title 0"
+
+
+def test_create_song_uses_cache(manager) -> None:
+    first = manager.create_song("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    second = manager.create_song("https://youtu.be/dQw4w9WgXcQ")
+
+    assert manager.downloader.downloader.calls == 1
+    assert first is not second
+    assert (first.title, first.url) == (second.title, second.url)
+
+
+@pytest.mark.asyncio
+async def test_stored_metadata_outlives_stream_url(manager, tmp_path, monkeypatch) -> None:
+    store = Metadata_store(str(tmp_path / "metadata.sqlite3"))
+    store.put("dQw4w9WgXcQ", {'title': "Never Gonna Give You Up", 'url': "https://stream/expired", 'duration': 212,
+                              'webpage_url': "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}, int(time.time()) + 60)
+    monkeypatch.setattr(playlist_manager, "metadata_store", store)
+
+    song = manager.create_song("https://youtu.be/dQw4w9WgXcQ")
+    assert manager.downloader.downloader.calls == 0
+    assert song.is_flat
+    assert (song.title, song.duration, song.id) == ("Never Gonna Give You Up", 212, "dQw4w9WgXcQ")
+
+    assert await manager.resolve_song(song)
+    assert manager.downloader.downloader.calls == 1
+    assert song.url == "https://stream/https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_expiring_stream_url_is_refreshed(manager) -> None:
+    song = Song(title="song", url="https://stream/old", id="dQw4w9WgXcQ", webpage_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                expire=int(time.time()) + 6 * 60 * 60)
+
+    assert await manager.resolve_song(song)
+    assert manager.downloader.downloader.calls == 0
+
+    song.expire = int(time.time()) + 60
+    assert await manager.resolve_song(song)
+    assert manager.downloader.downloader.calls == 1
+    assert song.url == "https://stream/https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("manager", [Unavailable_extractor], indirect=True)
+async def test_add_song_validates_with_a_single_extraction(manager) -> None:
+    playlist = Playlist()
+
+    assert not await manager.add_song("https://www.youtube.com/watch?v=unavailable", playlist)
+    assert playlist.size == 0
+    assert await manager.add_song("https://www.youtube.com/watch?v=SA2iWivDJiE", playlist)
+    assert playlist.size == 1
+    assert manager.downloader.downloader.calls == 2
+
+
+@pytest.mark.parametrize("manager", [Formats_extractor], indirect=True)
+def test_format_matches_target_bitrate(manager) -> None:
+    assert manager.create_song("https://www.youtube.com/watch?v=dQw4w9WgXcQ").url == "https://stream/251?expire=2000000000"
+
+    manager.target_bitrate = 64
+    song = manager.create_song("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    assert song.url == "https://stream/250?expire=2000000000"
+    assert song.acodec == "opus"
+
+    manager.target_bitrate = 96
+    assert manager.create_song("https://www.youtube.com/watch?v=dQw4w9WgXcQ").url == "https://stream/251?expire=2000000000"
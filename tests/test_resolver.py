@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from resolver import Metadata_resolver
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_does_not_block_event_loop() -> None:
+    resolver = Metadata_resolver(max_workers=2, max_concurrency=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    result = await resolver.run(lambda: time.sleep(0.2) or "done")
+    ticker_task.cancel()
+    resolver.shutdown()
+    assert result == "done"
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit() -> None:
+    resolver = Metadata_resolver(max_workers=8, max_concurrency=3)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def work(value):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return value
+
+    futures = [resolver.submit(work, i) for i in range(12)]
+    results = await asyncio.gather(*futures)
+    resolver.shutdown()
+    assert results == list(range(12))
+    assert max_running == 3
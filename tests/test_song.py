@@ -0,0 +1,66 @@
+import tracemalloc
+
+from song import Song
+
+QUEUED_SONGS = 100_000
+DISTINCT_TITLES = 1000
+
+
+class Legacy_song:
+    """The previous Song layout: a plain object with a __dict__ and linked list pointers."""
+
+    def __init__(self, title=None, url=None, duration=None, id=None, webpage_url=None, expire=None):
+        self.title = title
+        self.url = url
+        self.duration = duration
+        self.id = id
+        self.webpage_url = webpage_url
+        self.expire = expire
+        self.next = None
+        self.prev = None
+
+
+def bytes_per_song(song_class) -> float:
+    """Queues flat songs the way a playlist listing creates them and returns the memory taken per song."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    songs = []
+    for i in range(QUEUED_SONGS):
+        video_id = f"{i % DISTINCT_TITLES:011d}"
+        songs.append(song_class(title=f"Song title number {i % DISTINCT_TITLES}", duration=180, id=video_id,
+                                webpage_url=f"https://www.youtube.com/watch?v={video_id}"))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / QUEUED_SONGS
+
+
+def test_queued_song_takes_less_memory() -> None:
+    legacy = bytes_per_song(Legacy_song)
+    compact = bytes_per_song(Song)
+    assert compact < legacy / 2
+
+
+def test_titles_are_shared() -> None:
+    first = Song(title="".join(["shared ", "title"]), id="".join(["abc", "def"]))
+    second = Song(title="".join(["shared ", "title"]), id="".join(["abc", "def"]))
+    assert first.title is second.title
+    assert first.id is second.id
+
+
+def test_optional_fields_are_lazy() -> None:
+    song = Song(title="title", id="abc")
+    assert song._extra is None
+    assert song.is_flat
+    assert song.webpage_url == "https://www.youtube.com/watch?v=abc"
+    song.webpage_url = "https://www.youtube.com/watch?v=abc"
+    assert song._extra is None
+
+    song.url, song.expire = "https://stream", 1
+    assert not song.is_flat
+    assert song.expires_within(0)
+    song.url = song.expire = None
+    assert song._extra is None
+
+    other = Song(title="title", webpage_url="https://example.com/video")
+    assert other.webpage_url == "https://example.com/video"
+    assert not hasattr(other, "__dict__")
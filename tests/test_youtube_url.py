@@ -1,6 +1,8 @@
+import os
+
 import pytest
 
-from downloader import Youtube_downloader
+from downloader import ParsedURL, Youtube_downloader
 
 youtube_video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley"
 youtube_video_short_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
@@ -12,82 +14,90 @@ youtube_short_url = "https://www.youtube.com/shorts/RMiOtRFwbAg"
 
 
 def test_valid_youtube_url() -> None:
-    assert Youtube_downloader.is_youtube_url(youtube_video_url) == True
-    assert Youtube_downloader.is_youtube_url(youtube_video_short_url) == True
-    assert Youtube_downloader.is_youtube_url(youtube_stream_url) == True
-    assert Youtube_downloader.is_youtube_url(youtube_radio_url) == True
-    assert Youtube_downloader.is_youtube_url(youtube_playlist_url) == True 
-    assert Youtube_downloader.is_youtube_url(youtube_music_url) == True
-    assert Youtube_downloader.is_youtube_url(youtube_short_url) == True
+    assert Youtube_downloader.parse_youtube_url(youtube_video_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_video_short_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_stream_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_radio_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_playlist_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_music_url) is not None
+    assert Youtube_downloader.parse_youtube_url(youtube_short_url) is not None
 
 def test_not_valid_url() -> None:
     not_url = "Test"
     spotify_url = "https://open.spotify.com/track/4NsPgRYUdHu2Q5JRNgXYU5"
     link_without_protocol = "www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley"
     link_without_protocol_and_www = "youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley"
-    assert Youtube_downloader.is_youtube_url(not_url) == False
-    assert Youtube_downloader.is_youtube_url(spotify_url) == False
-    assert Youtube_downloader.is_youtube_url(link_without_protocol) == False
-    assert Youtube_downloader.is_youtube_url(link_without_protocol_and_www) == False
-
-@pytest.mark.asyncio
-async def test_available_youtube_url() -> None:
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_video_url) == True
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_video_short_url) == True
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_stream_url) == True
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_radio_url) == True
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_playlist_url) == True 
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_music_url) == True
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_short_url) == True
-
-@pytest.mark.asyncio
-async def test_unavailable_youtube_url() -> None:
-    youtube_unavailable_video_url = "https://www.youtube.com/watch?v=dQw4w9WgXcX&ab_channel=RickAstley"
-    youtube_unavailable_video_short_url = "https://www.youtube.com/watch?v=dQw4w9WgXcX"
-    youtube_unavailable_stream_url = "https://www.youtube.com/watch?v=jfKfPfyJXdk&ab_channel=LofiGirl"
-    youtube_unavailable_radio_url = "https://www.youtube.com/watch?v=eOiXXYaxRK8&list=RDeOii1YaxRK8&start_radio=1&ab_channel=Cringelord"
-    youtube_unavailable_playlist_url = "https://www.youtube.com/playlist?list=PLaIpgnL0MXXpQV5mBSMk73V4-1KS5IGpO"
-    youtube_unavailable_music_url = "https://music.youtube.com/watch?v=dQw4w9WgXcX"
-    youtube_unavailable_short_url = "https://www.youtube.com/shorts/RMiXXAFCbAg"
-    youtube_private_video_url = "https://www.youtube.com/watch?v=QayMbsOC5q4"
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_video_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_video_short_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_stream_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_radio_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_playlist_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_music_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_unavailable_short_url) == False
-    assert await Youtube_downloader.is_valid_youtube_url(youtube_private_video_url) == False
-
-def test_get_youtube_media_type() -> None:
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley") == "video"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == "video"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/watch?v=jfKfPfyJRdk&ab_channel=LofiGirl") == "video"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/watch?v=eOii1YaxRK8&list=RDeOii1YaxRK8&start_radio=1&ab_channel=Cringelord") == "mix"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/playlist?list=PLaIpgnL0MSIpQV5mBSMk73V4-1KS5IGpO") == "playlist"
-    assert Youtube_downloader.get_youtube_media_type("https://music.youtube.com/watch?v=dQw4w9WgXcQ") == "music"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/shorts/RMiOtRFwbAg") == "short"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/playlist?list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC") == "playlist"
-    assert Youtube_downloader.get_youtube_media_type("https://www.youtube.com/watch?v=Ph4BZqB7yr4&list=PLETrjXbz9eLX_QaeiE-Jx2uFyJTffFcu3&index=53") == "video"
-    
-def test_valid_youtube_urls() -> None:
-    file = open('tests\\youtube_urls.txt', 'r')
-    lines = file.readlines()
-    for line in lines:
-        assert Youtube_downloader.is_youtube_url(line) is True
-
-def test_normalize_youtube_video_url() -> None:
-    assert Youtube_downloader.normalize_youtube_video_url("http://youtu.be/SA2iWivDJiE") == "https://www.youtube.com/watch?v=SA2iWivDJiE"
-    assert Youtube_downloader.normalize_youtube_video_url("http://www.youtube.com/watch?v=_oPAwA_Udwc&feature=feedu") == "https://www.youtube.com/watch?v=_oPAwA_Udwc"
-    assert Youtube_downloader.normalize_youtube_video_url("http://www.youtube.com/embed/SA2iWivDJiE") == "https://www.youtube.com/watch?v=SA2iWivDJiE"
-    assert Youtube_downloader.normalize_youtube_video_url("http://www.youtube.com/v/SA2iWivDJiE?version=3&amp;hl=en_US") == "https://www.youtube.com/watch?v=SA2iWivDJiE"
-    assert Youtube_downloader.normalize_youtube_video_url("https://www.youtube.com/watch?v=rTHlyTphWP0&index=6&list=PLjeDyYvG6-40qawYNR4juzvSOg-ezZ2a6") == "https://www.youtube.com/watch?v=rTHlyTphWP0"
-    assert Youtube_downloader.normalize_youtube_video_url("youtube.com/watch?v=_lOT2p_FCvA") == "https://www.youtube.com/watch?v=_lOT2p_FCvA"
-    assert Youtube_downloader.normalize_youtube_video_url("youtu.be/watch?v=_lOT2p_FCvA") == "https://www.youtube.com/watch?v=_lOT2p_FCvA"
-    assert Youtube_downloader.normalize_youtube_video_url("https://www.youtube.com/watch?time_continue=9&v=n0g-Y0oo5Qs&feature=emb_logo") == "https://www.youtube.com/watch?v=n0g-Y0oo5Qs"
-
-def test_normalize_youtube_playlist_url() -> None:
+    assert Youtube_downloader.parse_youtube_url(not_url) is None
+    assert Youtube_downloader.parse_youtube_url(spotify_url) is None
+    assert Youtube_downloader.parse_youtube_url(link_without_protocol) is None
+    assert Youtube_downloader.parse_youtube_url(link_without_protocol_and_www) is None
+
+def test_video_url_is_canonical() -> None:
+    assert Youtube_downloader.parse_youtube_url("http://youtu.be/SA2iWivDJiE").video_url == "https://www.youtube.com/watch?v=SA2iWivDJiE"
+    assert Youtube_downloader.parse_youtube_url("http://www.youtube.com/watch?v=_oPAwA_Udwc&feature=feedu").video_url == "https://www.youtube.com/watch?v=_oPAwA_Udwc"
+    assert Youtube_downloader.parse_youtube_url("http://www.youtube.com/embed/SA2iWivDJiE").video_url == "https://www.youtube.com/watch?v=SA2iWivDJiE"
+    assert Youtube_downloader.parse_youtube_url("http://www.youtube.com/v/SA2iWivDJiE?version=3&amp;hl=en_US").video_url == "https://www.youtube.com/watch?v=SA2iWivDJiE"
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?v=rTHlyTphWP0&index=6&list=PLjeDyYvG6-40qawYNR4juzvSOg-ezZ2a6").video_url == "https://www.youtube.com/watch?v=rTHlyTphWP0"
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?time_continue=9&v=n0g-Y0oo5Qs&feature=emb_logo").video_url == "https://www.youtube.com/watch?v=n0g-Y0oo5Qs"
+
+def test_playlist_url_is_canonical() -> None:
     result = "https://www.youtube.com/playlist?list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC"
-    assert Youtube_downloader.normalize_youtube_playlist_url("https://www.youtube.com/playlist?list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC") == result
-    assert Youtube_downloader.normalize_youtube_playlist_url("https://www.youtube.com/watch?v=Jo9Mmx7AqDQ&list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC") == result
-    assert Youtube_downloader.normalize_youtube_playlist_url("https://www.youtube.com/watch?v=Jo9Mmx7AqDQ&list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC&ab_channel=AIClips") == result
\ No newline at end of file
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/playlist?list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC").playlist_url == result
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?v=Jo9Mmx7AqDQ&list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC").playlist_url == result
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?v=Jo9Mmx7AqDQ&list=PLMO3zUYl0xd2Zbrkx1ERFFrU6Z48DWTFC&ab_channel=AIClips").playlist_url == result
+
+
+def test_parse_youtube_url() -> None:
+    assert Youtube_downloader.parse_youtube_url(youtube_video_url) == ParsedURL("video", "dQw4w9WgXcQ")
+    assert Youtube_downloader.parse_youtube_url(youtube_radio_url) == ParsedURL("mix", "eOii1YaxRK8", "RDeOii1YaxRK8")
+    assert Youtube_downloader.parse_youtube_url(youtube_playlist_url) == ParsedURL("playlist", None, "PLaIpgnL0MSIpQV5mBSMk73V4-1KS5IGpO")
+    assert Youtube_downloader.parse_youtube_url(youtube_music_url) == ParsedURL("music", "dQw4w9WgXcQ")
+    assert Youtube_downloader.parse_youtube_url(youtube_short_url) == ParsedURL("short", "RMiOtRFwbAg")
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?v=Ph4BZqB7yr4&list=PLETrjXbz9eLX_QaeiE-Jx2uFyJTffFcu3&index=53") == ParsedURL("video", "Ph4BZqB7yr4", "PLETrjXbz9eLX_QaeiE-Jx2uFyJTffFcu3")
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/watch?v=jfKfPfyJRdk&ab_channel=musicradio").kind == "video"
+    assert Youtube_downloader.parse_youtube_url("https://youtu.be/lalOy8Mbfdc?t=1m30s") == ParsedURL("video", "lalOy8Mbfdc", None, 90)
+    assert Youtube_downloader.parse_youtube_url("https://www.youtube.com/attribution_link?a=JdfC0C9V6ZI&u=%2Fwatch%3Fv%3DEhxJLojIE_o%26feature%3Dshare").video_id == "EhxJLojIE_o"
+    assert Youtube_downloader.parse_youtube_url("https://open.spotify.com/track/4NsPgRYUdHu2Q5JRNgXYU5") is None
+    assert Youtube_downloader.parse_youtube_url("www.youtube.com/watch?v=dQw4w9WgXcQ") is None
+
+
+def test_parse_youtube_urls() -> None:
+    with open(os.path.join(os.path.dirname(__file__), 'youtube_urls.txt')) as file:
+        for line in file:
+            parsed_url = Youtube_downloader.parse_youtube_url(line)
+            assert parsed_url is not None and parsed_url.kind == "video"
+            assert len(parsed_url.video_id) == 11 and parsed_url.video_id in line
+
+
+YOUTUBE_FORMATS = [
+    {'format_id': "139", 'vcodec': "none", 'acodec': "mp4a.40.5", 'abr': 48.8, 'filesize': 1300000, 'url': "https://stream/139"},
+    {'format_id': "249", 'vcodec': "none", 'acodec': "opus", 'abr': 53.5, 'filesize': 1400000, 'url': "https://stream/249"},
+    {'format_id': "250", 'vcodec': "none", 'acodec': "opus", 'abr': 70.1, 'filesize': 1800000, 'url': "https://stream/250"},
+    {'format_id': "140", 'vcodec': "none", 'acodec': "mp4a.40.2", 'abr': 129.5, 'filesize': 3400000, 'url': "https://stream/140"},
+    {'format_id': "251", 'vcodec': "none", 'acodec': "opus", 'abr': 135.2, 'filesize': 3500000, 'url': "https://stream/251"},
+    {'format_id': "18", 'vcodec': "avc1.42001E", 'acodec': "mp4a.40.2", 'tbr': 500, 'url': "https://stream/18"},
+    {'format_id': "sb0", 'vcodec': "none", 'acodec': "none", 'url': "https://stream/sb0"},
+]
+
+
+def test_audio_formats_are_audio_only() -> None:
+    formats = Youtube_downloader.get_audio_formats({'formats': YOUTUBE_FORMATS})
+    assert [audio_format['format_id'] for audio_format in formats] == ["139", "249", "250", "140", "251"]
+    assert Youtube_downloader.get_audio_formats({}) == []
+
+
+@pytest.mark.parametrize("bitrate, format_id", [
+    (64, "250"),
+    (96, "251"),
+    (48, "249"),
+    (384, "251"),
+])
+def test_cheapest_sufficient_format_is_selected(bitrate, format_id) -> None:
+    formats = Youtube_downloader.get_audio_formats({'formats': YOUTUBE_FORMATS})
+    assert Youtube_downloader.select_audio_format(formats, bitrate)['format_id'] == format_id
+
+
+def test_non_opus_format_is_selected_without_opus() -> None:
+    formats = Youtube_downloader.get_audio_formats({'formats': [f for f in YOUTUBE_FORMATS if f['acodec'] != "opus"]})
+    assert Youtube_downloader.select_audio_format(formats, 96)['format_id'] == "140"
+    assert Youtube_downloader.select_audio_format([], 96) is None